@@ -0,0 +1,51 @@
+import datetime
+import os
+import subprocess
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+BUILD_INFO_PATH = "src/mcp_server_qdrant/_build_info.py"
+
+
+class BuildInfoHook(BuildHookInterface):
+    """
+    Bakes the git commit hash and the build time into `_build_info.py`, so the
+    server does not have to fork `git` on every startup.
+    """
+
+    def initialize(self, version: str, build_data: dict) -> None:
+        path = os.path.join(self.root, BUILD_INFO_PATH)
+        # Editable installs keep asking git at runtime, so the hash follows the checkout.
+        if version == "editable":
+            # A file left in the checkout by an earlier wheel build would pin a stale
+            # hash. Without .git (an sdist) it is the only record of the hash, so keep it.
+            if os.path.exists(path) and os.path.exists(os.path.join(self.root, ".git")):
+                os.remove(path)
+            return
+
+        try:
+            git_hash = (
+                subprocess.check_output(
+                    ["git", "rev-parse", "--short", "HEAD"],
+                    cwd=self.root,
+                    stderr=subprocess.DEVNULL,
+                )
+                .decode("ascii")
+                .strip()
+            )
+        except Exception:
+            # Building a wheel from an sdist: there is no .git, but the sdist
+            # already ships the file generated from the original checkout.
+            if os.path.exists(path):
+                build_data["artifacts"].append(BUILD_INFO_PATH)
+                return
+            git_hash = "unknown"
+
+        build_time = datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="seconds"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# This file is generated at build time by hatch_build.py.\n")
+            f.write(f'GIT_HASH = "{git_hash}"\n')
+            f.write(f'BUILD_TIME = "{build_time}"\n')
+        build_data["artifacts"].append(BUILD_INFO_PATH)
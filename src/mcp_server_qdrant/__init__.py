@@ -0,0 +1,14 @@
+import importlib
+
+# Heavy submodules (fastembed, qdrant-client, fastmcp) are only imported on first
+# access, so `mcp-server-qdrant --help` and argument errors return immediately.
+
+
+def __getattr__(name):
+    if name == "memory":
+        return importlib.import_module(f"{__name__}.memory")
+    if name == "QdrantMCPServer":
+        from .mcp_server import QdrantMCPServer
+
+        return QdrantMCPServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
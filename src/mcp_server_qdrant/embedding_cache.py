@@ -0,0 +1,71 @@
+import hashlib
+import sqlite3
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from mcp_server_qdrant.embeddings.base import Vector
+
+
+class EmbeddingCache:
+    """
+    A disk-backed cache of document embeddings, keyed by the SHA-256 of the content and
+    the model that embedded it. Vectors are stored as float16 blobs, which halves the
+    file size; the precision lost is far below what cosine search can notice.
+    :param path: The path of the SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        # The connector calls the cache from executor threads, so the connection is
+        # shared across threads, one statement at a time under the lock.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "hash BLOB NOT NULL, model TEXT NOT NULL, vec BLOB NOT NULL, "
+                "PRIMARY KEY (hash, model))"
+            )
+
+    @staticmethod
+    def _hash(content: str) -> bytes:
+        return hashlib.sha256(content.encode("utf-8")).digest()
+
+    def get_many(
+        self, contents: Sequence[str], model: str
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Look up the embeddings of several contents, with None for the ones not cached.
+        """
+        hashes = [self._hash(content) for content in contents]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN (%s)"
+                % ",".join("?" * len(hashes)),
+                [model, *hashes],
+            ).fetchall()
+        found = {
+            h: np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+            for h, vec in rows
+        }
+        return [found.get(h) for h in hashes]
+
+    def put_many(self, contents: Sequence[str], model: str, vectors: Sequence[Vector]):
+        """
+        Store the embeddings of several contents, replacing any existing ones.
+        """
+        rows = [
+            (self._hash(content), model, np.asarray(vector, dtype=np.float16).tobytes())
+            for content, vector in zip(contents, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, model, vec) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
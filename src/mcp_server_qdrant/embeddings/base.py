@@ -1,20 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Union
+
+import numpy as np
+
+# An embedding: a list of floats, or a 1-D float32 NumPy array.
+Vector = Union[List[float], np.ndarray]
 
 
 class EmbeddingProvider(ABC):
-    """Abstract base class for embedding providers."""
+    """
+    Abstract base class for embedding providers. The Qdrant client and the caches accept
+    either kind of Vector.
+    """
 
     @abstractmethod
-    async def embed_documents(self, documents: List[str]) -> List[List[float]]:
+    async def embed_documents(self, documents: List[str]) -> List[Vector]:
         """Embed a list of documents into vectors."""
         pass
 
     @abstractmethod
-    async def embed_query(self, query: str) -> List[float]:
+    async def embed_query(self, query: str) -> Vector:
         """Embed a query into a vector."""
         pass
 
+    async def embed_queries(self, queries: List[str]) -> List[Vector]:
+        """Embed several queries into vectors. Providers should override this to batch."""
+        return [await self.embed_query(query) for query in queries]
+
     @abstractmethod
     def get_vector_name(self) -> str:
         """Get the name of the vector for the Qdrant collection."""
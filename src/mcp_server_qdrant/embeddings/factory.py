@@ -1,3 +1,4 @@
+import functools
 import logging
 from mcp_server_qdrant.embeddings.base import EmbeddingProvider
 from mcp_server_qdrant.embeddings.types import EmbeddingProviderType
@@ -17,3 +18,24 @@ def create_embedding_provider(settings: EmbeddingProviderSettings) -> EmbeddingP
         return FastEmbedProvider(settings.model_name)
     else:
         raise ValueError(f"Unsupported embedding provider: {settings.provider_type}")
+
+
+def get_embedding_provider(settings: EmbeddingProviderSettings) -> EmbeddingProvider:
+    """
+    Return the shared embedding provider for these settings, creating it on first use,
+    so the model is loaded once per process rather than once per caller.
+    :param settings: The settings for the embedding provider.
+    :return: The shared instance of the specified embedding provider.
+    """
+    return _get_embedding_provider(settings.provider_type, settings.model_name)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_embedding_provider(
+    provider_type: EmbeddingProviderType, model_name: str
+) -> EmbeddingProvider:
+    return create_embedding_provider(
+        EmbeddingProviderSettings.model_construct(
+            provider_type=provider_type, model_name=model_name
+        )
+    )
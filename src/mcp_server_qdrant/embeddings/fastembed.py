@@ -1,56 +1,76 @@
 import asyncio
 import logging
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
+import numpy as np
 from fastembed import TextEmbedding
 from fastembed.common.model_description import DenseModelDescription
 
-from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, Vector
+
+logger = logging.getLogger(__name__)
 
 
 class FastEmbedProvider(EmbeddingProvider):
     """
     FastEmbed implementation of the embedding provider.
     :param model_name: The name of the FastEmbed model to use.
+    :param max_workers: The number of threads running the model, by default one per CPU.
     """
 
-    def __init__(self, model_name: str):
-        logging.info(f"[fastembed.py] Initializing FastEmbedProvider with model: {model_name}")
+    def __init__(self, model_name: str, max_workers: Optional[int] = None):
+        logger.info("[fastembed.py] Initializing FastEmbedProvider with model: %s", model_name)
         self.model_name = model_name
         self.embedding_model = TextEmbedding(model_name)
+        # FastEmbed is synchronous; inference runs on a dedicated pool (ONNX releases
+        # the GIL), so it neither blocks the event loop nor queues behind other work
+        # on the loop's default executor.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), thread_name_prefix="fastembed"
+        )
 
-    async def embed_documents(self, documents: List[str]) -> List[List[float]]:
-        """Embed a list of documents into vectors."""
-        logging.info(f"[fastembed.py] Embedding {len(documents)} documents with model: {self.model_name}")
-        # Run in a thread pool since FastEmbed is synchronous
-        loop = asyncio.get_event_loop()
+    async def embed_documents(self, documents: List[str]) -> List[Vector]:
+        """
+        Embed a list of documents into vectors. Like the query methods, it returns
+        contiguous float32 arrays rather than lists of boxed Python floats.
+        """
+        logger.debug("[fastembed.py] Embedding %d documents with model: %s", len(documents), self.model_name)
+        loop = asyncio.get_running_loop()
         embeddings = await loop.run_in_executor(
-            None, lambda: list(self.embedding_model.passage_embed(documents))
+            self._executor, lambda: list(self.embedding_model.passage_embed(documents))
         )
-        return [embedding.tolist() for embedding in embeddings]
+        return [np.asarray(embedding, dtype=np.float32) for embedding in embeddings]
 
-    async def embed_query(self, query: str) -> List[float]:
+    async def embed_query(self, query: str) -> np.ndarray:
         """Embed a query into a vector."""
-        logging.info(f"[fastembed.py] Embedding query with model: {self.model_name}")
-        # Run in a thread pool since FastEmbed is synchronous
-        loop = asyncio.get_event_loop()
+        logger.debug("[fastembed.py] Embedding query with model: %s", self.model_name)
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(
+            self._executor, lambda: list(self.embedding_model.query_embed([query]))
+        )
+        return np.asarray(embeddings[0], dtype=np.float32)
+
+    async def embed_queries(self, queries: List[str]) -> List[Vector]:
+        """Embed several queries into vectors in a single pass."""
+        logger.debug("[fastembed.py] Embedding %d queries with model: %s", len(queries), self.model_name)
+        loop = asyncio.get_running_loop()
         embeddings = await loop.run_in_executor(
-            None, lambda: list(self.embedding_model.query_embed([query]))
+            self._executor, lambda: list(self.embedding_model.query_embed(queries))
         )
-        return embeddings[0].tolist()
+        return [np.asarray(embedding, dtype=np.float32) for embedding in embeddings]
 
     def get_vector_name(self) -> str:
         """
         Return the name of the vector for the Qdrant collection.
         Important: This is compatible with the FastEmbed logic used before 0.6.0.
         """
-        logging.info(f"[fastembed.py] Getting vector name for model: {self.model_name}")
         model_name = self.embedding_model.model_name.split("/")[-1].lower()
         return f"fast-{model_name}"
 
     def get_vector_size(self) -> int:
         """Get the size of the vector for the Qdrant collection."""
-        logging.info(f"[fastembed.py] Getting vector size for model: {self.model_name}")
         model_description: DenseModelDescription = (
             self.embedding_model._get_model_description(self.model_name)
         )
@@ -1,8 +1,95 @@
-import argparse
+import json
 import logging
-import subprocess
+import os
+import sys
 import datetime
-from . import memory
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+
+except ImportError:
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str, separators=(",", ":"), ensure_ascii=False)
+
+# Module load time, computed once (and without the deprecated utcnow()).
+_LOADED_AT = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+# Bind to all network interfaces on a fixed port for the HTTP-based transports.
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8000
+HTTP_TRANSPORTS = ("sse", "streamable-http")
+
+# Third-party loggers that are chatty below WARNING (one record per HTTP request).
+NOISY_LOGGERS = ("httpx", "httpcore", "qdrant_client", "grpc")
+
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as a single JSON line, including the fields passed via `extra=`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return _dumps(data)
+
+
+def configure_logging():
+    """
+    Configure the root logger from the LOG_LEVEL and LOG_FORMAT environment variables.
+    """
+    level = (os.environ.get("LOG_LEVEL") or "WARNING").upper()
+    # getLevelName maps a known level name to its number; anything else comes back
+    # as a string, which basicConfig would reject with a ValueError.
+    invalid_level = not isinstance(logging.getLevelName(level), int)
+    if invalid_level:
+        level = "WARNING"
+    if os.environ.get("LOG_FORMAT", "").lower() == "json":
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonFormatter())
+        logging.basicConfig(level=level, handlers=[handler])
+    else:
+        logging.basicConfig(level=level)
+    if invalid_level:
+        logging.warning(
+            "[main.py] Unknown LOG_LEVEL %r, using WARNING.", os.environ.get("LOG_LEVEL")
+        )
+    # Even with LOG_LEVEL=DEBUG, keep the client libraries from formatting a record
+    # for every request they make.
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def install_uvloop():
+    """
+    Use uvloop's event loop for the server, if it is installed. The tools are async
+    and I/O-bound, so the cheaper awaits of the libuv-based loop add up.
+    """
+    if sys.platform == "win32":
+        return
+    try:
+        import uvloop
+    except ImportError:
+        return
+    import asyncio
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 def main():
@@ -11,78 +98,77 @@ def main():
     in pyproject.toml. It runs the MCP server with a specific transport
     protocol.
     """
-    logging.basicConfig(level=logging.INFO)
-    logging.info("[main.py] Starting MCP server entrypoint...")
+    configure_logging()
 
-    # Log the running git commit hash and load time
+    # Resolve the running git commit hash. The hash is baked in at build time
+    # (see hatch_build.py); only dev checkouts have to ask git.
     try:
-        GIT_HASH = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).decode('ascii').strip()
-        logging.debug(f"[main.py] Retrieved git hash: {GIT_HASH}")
-    except Exception as e:
-        GIT_HASH = "unknown"
-        logging.error(f"[main.py] Failed to retrieve git hash: {e}")
-    logging.info(f"[memory.py] MCP server version: {GIT_HASH} (loaded {datetime.datetime.utcnow().isoformat()} UTC)")
+        from mcp_server_qdrant._build_info import BUILD_TIME, GIT_HASH
+    except ImportError:
+        import subprocess
+
+        BUILD_TIME = "dev"
+        try:
+            GIT_HASH = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).decode('ascii').strip()
+        except Exception as e:
+            GIT_HASH = "unknown"
+            logging.error(f"[main.py] Failed to retrieve git hash: {e}")
 
     # Parse the command-line arguments to determine the transport protocol.
-    parser = argparse.ArgumentParser(description="mcp-server-qdrant")
-    parser.add_argument(
-        "--transport",
-        choices=["stdio", "sse", "streamable-http"],
-        default="stdio",
+    # A bare invocation is the common stdio case and skips argparse entirely.
+    if len(sys.argv) == 1:
+        transport = "stdio"
+    else:
+        import argparse
+
+        parser = argparse.ArgumentParser(description="mcp-server-qdrant")
+        parser.add_argument(
+            "--transport",
+            choices=["stdio", "sse", "streamable-http"],
+            default="stdio",
+        )
+        args = parser.parse_args()
+        transport = args.transport
+
+    # A single structured record for the whole startup sequence.
+    logging.info(
+        "[main.py] Starting MCP server version %s (built %s, loaded %s) with transport %s",
+        GIT_HASH,
+        BUILD_TIME,
+        _LOADED_AT,
+        transport,
+        extra={
+            "transport": transport,
+            "git_hash": GIT_HASH,
+            "build_time": BUILD_TIME,
+            "pid": os.getpid(),
+        },
     )
-    args = parser.parse_args()
-    logging.info(f"[main.py] Parsed arguments: {args}")
 
     # Import is done here to make sure environment variables are loaded
     # only after we make the changes.
-    logging.info("[main.py] Importing mcp_server_qdrant.server.mcp ...")
     try:
         from mcp_server_qdrant.server import mcp
-        logging.debug("[main.py] Successfully imported mcp_server_qdrant.server.mcp")
     except ImportError as e:
         logging.error(f"[main.py] Failed to import mcp_server_qdrant.server.mcp: {e}")
         raise
 
-    # Set FORCE_ASGI_SERVER env var only for HTTP/SSE transports
-    import os
-    if args.transport in ("sse", "streamable-http"):
-        os.environ["FORCE_ASGI_SERVER"] = "1"
-    else:
-        os.environ.pop("FORCE_ASGI_SERVER", None)
-
-    logging.info(f"[main.py] Running MCP server with transport: {args.transport}")
-
-    # Add additional configuration for SSE and streamable-http transport
-    if args.transport in ("sse", "streamable-http"):
-        logging.info(f"[main.py] Using {args.transport} transport with additional configuration")
-        try:
-            logging.debug(f"[main.py] Preparing to run MCP server with {args.transport} transport")
-            mcp.run(
-                transport=args.transport, 
-                host="0.0.0.0",      # Explicitly bind to all network interfaces
-                port=8000,           # Explicitly set port
-                log_level="info"
-            )
-            logging.debug(f"[main.py] MCP server with {args.transport} transport started successfully")
-        except Exception as e:
-            logging.error(f"[main.py] Failed to run MCP server with {args.transport} transport: {e}")
-            raise
-    else:
-        logging.info(f"[main.py] Using standard {args.transport} transport")
-        try:
-            logging.debug(f"[main.py] Preparing to run MCP server with transport {args.transport}")
-            mcp.run(transport=args.transport)
-            logging.debug(f"[main.py] MCP server with transport {args.transport} started successfully")
-        except Exception as e:
-            logging.error(f"[main.py] Failed to run MCP server with transport {args.transport}: {e}")
-            raise
+    # The transport and its options are passed to FastMCP explicitly; no
+    # process-wide environment flag is involved.
+    run_kwargs = {}
+    if transport in HTTP_TRANSPORTS:
+        run_kwargs = {"host": DEFAULT_HOST, "port": DEFAULT_PORT, "log_level": "info"}
+    install_uvloop()
+    try:
+        mcp.run(transport=transport, **run_kwargs)
+    except Exception as e:
+        logging.error(f"[main.py] Failed to run MCP server with {transport} transport: {e}")
+        raise
 
 
 if __name__ == "__main__":
     try:
-        logging.debug("[main.py] Entering main function")
         main()
-        logging.debug("[main.py] Exiting main function")
     except Exception as e:
         logging.critical(f"[main.py] Unhandled exception in main: {e}")
         raise
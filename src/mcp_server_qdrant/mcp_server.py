@@ -1,24 +1,67 @@
+import asyncio
+import functools
 import logging
 import datetime
+from contextlib import asynccontextmanager
 from typing import Any, List, Optional
 
 from fastmcp import Context, FastMCP
 
-from mcp_server_qdrant.embeddings.factory import create_embedding_provider
-from mcp_server_qdrant.qdrant import Entry, QdrantConnector
+from mcp_server_qdrant.common.func_tools import make_partial_function
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from mcp_server_qdrant.embeddings.factory import get_embedding_provider
+from mcp_server_qdrant.qdrant import QdrantConnector, get_qdrant_connector
+from mcp_server_qdrant.semantic_cache import SemanticQueryCache
 from mcp_server_qdrant.settings import (
     EmbeddingProviderSettings,
     QdrantSettings,
     ToolSettings,
 )
 
-# Állítsd be a globális logging-ot a legelején
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+# Logging is configured by the entry point (see main.py), not on import.
+logger = logging.getLogger(__name__)
+
+
+class _LazyMemory:
+    """
+    Proxy for the memory module, imported on first attribute access. Constructing a
+    server does not pull it in, and tests can monkeypatch `_memory` instead.
+    """
+
+    def __getattr__(self, name: str):
+        from mcp_server_qdrant import memory
+
+        return getattr(memory, name)
+
+
+_memory = _LazyMemory()
+
+# Tool descriptions, defined once at import rather than rebuilt at every registration.
+MEMORY_QUERY_DESCRIPTION = (
+    "Retrieve facts, notes, or memories previously taught to the assistant in conversations or explicit requests. "
+    "Not for real-time sensor or device state (use the entity API for that). "
+    "Example: Find out when the user last watered the plants, or what birthday message was set last month. "
+    "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
+)
+MEMORY_QUERY_BATCH_DESCRIPTION = (
+    "Retrieve memories for several related questions at once, e.g. the sub-questions of a multi-step task. "
+    "Same as memory_query, but all queries are answered in a single call. "
+    "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
 )
+MEMORY_UPSERT_DESCRIPTION = (
+    "Store a new fact, event, or personal note for long-term memory. "
+    "Use for anything you want the assistant to remember in future conversations. "
+    "Not for real-time sensor/device values! "
+    "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
+)
+DUMMY_TOOL_DESCRIPTION = "A dummy tool for testing connectivity and latency. Always returns instantly."
 
-logger = logging.getLogger(__name__)
+# Queries shorter than this (after stripping) are rejected before embedding; they
+# are almost always empty or junk arguments from the calling model.
+MIN_QUERY_LENGTH = 3
+
+# Bound once, so formatting a result line is a single C-level call per entry.
+_ENTRY_TMPL = "• {} (timestamp: {}, collection: {})".format
 
 
 # FastMCP is an alternative interface for declaring the capabilities
@@ -37,267 +80,288 @@ class QdrantMCPServer(FastMCP):
         instructions: str | None = None,
         **settings: Any,
     ):
-        logging.info("[mcp_server.py] Initializing QdrantMCPServer...")
+        logger.info("[mcp_server.py] Initializing QdrantMCPServer...")
         self.tool_settings = tool_settings
         self.qdrant_settings = qdrant_settings
         self.embedding_provider_settings = embedding_provider_settings
-
-        self.embedding_provider = create_embedding_provider(embedding_provider_settings)
-        self.qdrant_connector = QdrantConnector(
-            qdrant_settings.location,
-            qdrant_settings.api_key,
-            qdrant_settings.collection_name,
-            self.embedding_provider,
-            qdrant_settings.local_path,
+        self.query_cache = SemanticQueryCache(
+            max_size=qdrant_settings.query_cache_size,
+            threshold=qdrant_settings.query_cache_threshold,
+            ttl=qdrant_settings.query_cache_ttl,
         )
 
+        self.initialized = False
+        self._warmup_task: Optional[asyncio.Task] = None
+        settings.setdefault("lifespan", _warmup_lifespan)
+
         super().__init__(name=name, instructions=instructions, **settings)
 
-        # --- Memory tools registration ---
-        from .memory import memory_query, memory_upsert
-
-        async def dummy_adapter(ctx: Context) -> List[str]:
-            logger = logging.getLogger(__name__)
-            logger.info("[mcp_server.py] DUMMY ADAPTER called")
-            await ctx.debug("DUMMY ADAPTER called")
-            return [f"Dummy adapter response at {datetime.datetime.utcnow().isoformat()} UTC"]
-
-        async def memory_query_adapter(
-            ctx: Context,
-            query: str,
-            top_k: int = 10,
-            collection_name: Optional[str] = None,
-            user_id: Optional[str] = None,
-        ) -> List[str]:
-            logger = logging.getLogger(__name__)
-            logger.info(f"[mcp_server.py] memory_query_adapter START: query='{query}', top_k={top_k}, collection_name={collection_name}, user_id={user_id}")
-            await ctx.debug(f"memory_query_adapter START: query='{query}', top_k={top_k}, collection_name={collection_name}, user_id={user_id}")
-            if collection_name is None:
-                collection_name = "default"
-            try:
-                logger.info("[mcp_server.py] About to call memory_query function...")
-                result = await memory_query(query, top_k=top_k, collection_name=collection_name, user_id=user_id)
-                logger.info(f"[mcp_server.py] memory_query returned successfully: {result}")
-
-                entries = [
-                    Entry(
-                        content=entry_dict["content"],
-                        metadata=entry_dict.get("metadata"),
-                        score=entry_dict.get("score")
-                    )
-                    for entry_dict in result["result"]
-                ]
-
-                logger.info(f"[mcp_server.py] Processed {len(entries)} entries from memory_query")
-
-                if not entries:
-                    logger.info(f"[mcp_server.py] No entries found for query '{query}'")
-                    logger.info("[mcp_server.py] memory_query_adapter END (no entries)")
-                    return [f"No information found for the query '{query}'"]
-
-                response = [
-                    f"Results for '{query}':"
-                ] + [
-                    f"• {entry.content} (timestamp: {entry.metadata.get('timestamp', '-')}, collection: {entry.metadata.get('collection_name', '-')})"
-                    for entry in entries
-                ]
-                logger.info(f"[mcp_server.py] Returning response with {len(response)} items")
-                logger.info("[mcp_server.py] memory_query_adapter END (success)")
-                return  response
-            except Exception as e:
-                logger = logging.getLogger(__name__)
-                logger.exception(f"[mcp_server.py] Exception in memory_query_adapter: {str(e)}")
-                logger.info("[mcp_server.py] memory_query_adapter END (exception)")
-                return [f"Error searching for '{query}': {str(e)}"]
-            # extra safety
-            logger.info("[mcp_server.py] memory_query_adapter END (unknown error)")
-            return ["Unknown error!"]
-
-        async def memory_upsert_adapter(
-            ctx: Context,
-            content: str,
-            collection_name: Optional[str] = None,
-            metadata: Optional[dict] = None,
-            id: Optional[str] = None,
-        ) -> List[str]:
-            logger = logging.getLogger(__name__)
-            logger.info(f"[mcp_server.py] memory_upsert_adapter START: content='{content}', collection_name={collection_name}, metadata={metadata}, id={id}")
-            await ctx.debug(f"memory_upsert_adapter START: content='{content}', collection_name={collection_name}, metadata={metadata}, id={id}")
-            if collection_name is None:
-                collection_name = "default"
-            try:
-                result = await memory_upsert(content, collection_name=collection_name, metadata=metadata, id=id)
-                ts = result["metadata"].get("timestamp", "-")
-                logger.info(f"[mcp_server.py] memory_upsert_adapter END (success): stored in '{collection_name}' ts={ts}")
-                return [f"Successfully stored in collection '{collection_name}': '{content}' (timestamp: {ts})"]
-            except Exception as e:
-                logger = logging.getLogger(__name__)
-                logger.exception("[mcp_server.py] Exception in memory_upsert_adapter")
-                logger.info("[mcp_server.py] memory_upsert_adapter END (exception)")
-                return [f"An error occurred: {str(e)}"]
-            # extra safety
-            logger.info("[mcp_server.py] memory_upsert_adapter END (unknown error)")
-            return ["Unknown error!"]
-
-        # Register memory tools 
-        self.add_tool(
-            memory_query_adapter,
-            name="memory_query",
-            description=(
-                "Retrieve facts, notes, or memories previously taught to the assistant in conversations or explicit requests. "
-                "Not for real-time sensor or device state (use the entity API for that). "
-                "Example: Find out when the user last watered the plants, or what birthday message was set last month. "
-                "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
-            ),
-        )
-        self.add_tool(
-            memory_upsert_adapter,
-            name="memory_upsert",
-            description=(
-                "Store a new fact, event, or personal note for long-term memory. "
-                "Use for anything you want the assistant to remember in future conversations. "
-                "Not for real-time sensor/device values! "
-                "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
-            ),
-        )
-        self.add_tool(
-            dummy_adapter,
-            name="dummy_tool",
-            description="A dummy tool for testing connectivity and latency. Always returns instantly.",
+        self._register_tools()
+
+    @functools.cached_property
+    def embedding_provider(self) -> EmbeddingProvider:
+        """
+        The embedding provider, created on first use, so the model is not loaded
+        until a tool actually needs it. Shared by every server with the same settings.
+        """
+        return get_embedding_provider(self.embedding_provider_settings)
+
+    @functools.cached_property
+    def qdrant_connector(self) -> QdrantConnector:
+        """
+        The Qdrant connector, created on first use. Shared by every server with the same settings.
+        """
+        return get_qdrant_connector(
+            self.qdrant_settings.location,
+            self.qdrant_settings.api_key,
+            self.qdrant_settings.collection_name,
+            self.embedding_provider,
+            self.qdrant_settings.local_path,
+            self.embedding_provider_settings.cache_path,
+            self.qdrant_settings.quantization,
+            self.qdrant_settings.quantization_always_ram,
+            self.qdrant_settings.pool_size,
+            self.qdrant_settings.prefer_grpc,
         )
-        logging.info("[mcp_server.py] Registered 'memory_query', 'memory_upsert' and 'dummy_tool' tools.")
-        # FastAPI router and endpoints removed: not needed in MCP stdio/sse mode
+
+    async def warmup(self):
+        """
+        Load the embedding model used by the memory tools and run one query through it,
+        and create the Qdrant client, so the first real request does not pay for them.
+        """
+        logger.info("[mcp_server.py] Warming up the embedding model...")
+        try:
+            # The same loads requests wait for, so one arriving meanwhile does not start another.
+            provider = await _memory.load_default_embedding_provider()
+            await provider.embed_query("warmup")
+            await _memory.load_default_qdrant_client()
+        except Exception as e:
+            # Not fatal: the model is loaded again on the first request.
+            logger.error(f"[mcp_server.py] Embedding model warmup failed: {e}")
+            return
+        logger.info("[mcp_server.py] Embedding model warmed up.")
 
     async def initialize_server(self):
         """
         Perform any asynchronous initialization tasks required for the server.
         """
-        logging.info("[mcp_server.py] Performing server initialization...")
+        logger.info("[mcp_server.py] Performing server initialization...")
         await self.qdrant_connector.initialize()
-        logging.info("[mcp_server.py] Qdrant connector initialized.")
+        logger.info("[mcp_server.py] Qdrant connector initialized.")
         self.initialized = True
 
     async def setup_tools(self):
-        logging.info("[mcp_server.py] Setting up tools for QdrantMCPServer.")
         """
-        Register the tools in the server.
+        Make sure the server is initialized before the tools are used. The tools
+        themselves are registered once, when the server is constructed.
         """
-        # Ensure server is initialized before registering tools
-        if not hasattr(self, 'initialized') or not self.initialized:
-            logging.warning("[mcp_server.py] Server not initialized. Initializing now...")
+        if not self.initialized:
             await self.initialize_server()
 
+    def _register_tools(self):
+        """
+        Register the module-level tool implementations, bound to this server.
+        """
         # --- Memory tools registration ---
-        from .memory import memory_query, memory_upsert
-
-        async def dummy_adapter(ctx: Context) -> List[str]:
-            logger = logging.getLogger(__name__)
-            logger.info("[mcp_server.py] DUMMY ADAPTER called")
-            await ctx.debug("DUMMY ADAPTER called")
-            return [f"Dummy adapter response at {datetime.datetime.utcnow().isoformat()} UTC"]
-
-        async def memory_query_adapter(
-            ctx: Context,
-            query: str,
-            top_k: int = 10,
-            collection_name: Optional[str] = None,
-            user_id: Optional[str] = None,
-        ) -> List[str]:
-            logger = logging.getLogger(__name__)
-            logger.info(f"[mcp_server.py] memory_query_adapter START: query='{query}', top_k={top_k}, collection_name={collection_name}, user_id={user_id}")
-            await ctx.debug(f"memory_query_adapter START: query='{query}', top_k={top_k}, collection_name={collection_name}, user_id={user_id}")
-            if collection_name is None:
-                collection_name = "default"
-            try:
-                logger.info("[mcp_server.py] About to call memory_query function...")
-                result = await memory_query(query, top_k=top_k, collection_name=collection_name, user_id=user_id)
-                logger.info(f"[mcp_server.py] memory_query returned successfully: {result}")
-
-                entries = [
-                    Entry(
-                        content=entry_dict["content"],
-                        metadata=entry_dict.get("metadata"),
-                        score=entry_dict.get("score")
-                    )
-                    for entry_dict in result["result"]
-                ]
-
-                logger.info(f"[mcp_server.py] Processed {len(entries)} entries from memory_query")
-
-                if not entries:
-                    logger.info(f"[mcp_server.py] No entries found for query '{query}'")
-                    logger.info("[mcp_server.py] memory_query_adapter END (no entries)")
-                    return [f"No information found for the query '{query}'"]
-
-                response = [
-                    f"Results for '{query}':"
-                ] + [
-                    f"• {entry.content} (timestamp: {entry.metadata.get('timestamp', '-')}, collection: {entry.metadata.get('collection_name', '-')})"
-                    for entry in entries
-                ]
-                logger.info(f"[mcp_server.py] Returning response with {len(response)} items")
-                logger.info("[mcp_server.py] memory_query_adapter END (success)")
-                return  response
-            except Exception as e:
-                logger = logging.getLogger(__name__)
-                logger.exception(f"[mcp_server.py] Exception in memory_query_adapter: {str(e)}")
-                logger.info("[mcp_server.py] memory_query_adapter END (exception)")
-                return [f"Error searching for '{query}': {str(e)}"]
-            # extra safety
-            logger.info("[mcp_server.py] memory_query_adapter END (unknown error)")
-            return ["Unknown error!"]
-
-        async def memory_upsert_adapter(
-            ctx: Context,
-            content: str,
-            collection_name: Optional[str] = None,
-            metadata: Optional[dict] = None,
-            id: Optional[str] = None,
-        ) -> List[str]:
-            logger = logging.getLogger(__name__)
-            logger.info(f"[mcp_server.py] memory_upsert_adapter START: content='{content}', collection_name={collection_name}, metadata={metadata}, id={id}")
-            await ctx.debug(f"memory_upsert_adapter START: content='{content}', collection_name={collection_name}, metadata={metadata}, id={id}")
-            if collection_name is None:
-                collection_name = "default"
-            try:
-                result = await memory_upsert(content, collection_name=collection_name, metadata=metadata, id=id)
-                ts = result["metadata"].get("timestamp", "-")
-                logger.info(f"[mcp_server.py] memory_upsert_adapter END (success): stored in '{collection_name}' ts={ts}")
-                return [f"Successfully stored in collection '{collection_name}': '{content}' (timestamp: {ts})"]
-            except Exception as e:
-                logger = logging.getLogger(__name__)
-                logger.exception("[mcp_server.py] Exception in memory_upsert_adapter")
-                logger.info("[mcp_server.py] memory_upsert_adapter END (exception)")
-                return [f"An error occurred: {str(e)}"]
-            # extra safety
-            logger.info("[mcp_server.py] memory_upsert_adapter END (unknown error)")
-            return ["Unknown error!"]
-
-        # Register memory tools 
         self.add_tool(
-            memory_query_adapter,
+            make_partial_function(memory_query_adapter, {"server": self}),
             name="memory_query",
-            description=(
-                "Retrieve facts, notes, or memories previously taught to the assistant in conversations or explicit requests. "
-                "Not for real-time sensor or device state (use the entity API for that). "
-                "Example: Find out when the user last watered the plants, or what birthday message was set last month. "
-                "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
-            ),
+            description=MEMORY_QUERY_DESCRIPTION,
+        )
+        self.add_tool(
+            make_partial_function(memory_query_batch_adapter, {"server": self}),
+            name="memory_query_batch",
+            description=MEMORY_QUERY_BATCH_DESCRIPTION,
         )
         self.add_tool(
-            memory_upsert_adapter,
+            make_partial_function(memory_upsert_adapter, {"server": self}),
             name="memory_upsert",
-            description=(
-                "Store a new fact, event, or personal note for long-term memory. "
-                "Use for anything you want the assistant to remember in future conversations. "
-                "Not for real-time sensor/device values! "
-                "For current sensor or device values, use the Home Assistant entity API/tool, not this memory tool."
-            ),
+            description=MEMORY_UPSERT_DESCRIPTION,
         )
         self.add_tool(
             dummy_adapter,
             name="dummy_tool",
-            description="A dummy tool for testing connectivity and latency. Always returns instantly.",
+            description=DUMMY_TOOL_DESCRIPTION,
+        )
+        logger.info(
+            "[mcp_server.py] Registered 'memory_query', 'memory_query_batch', 'memory_upsert' and 'dummy_tool' tools."
         )
-        logging.info("[mcp_server.py] Registered 'memory_query', 'memory_upsert' and 'dummy_tool' tools.")
         # FastAPI router and endpoints removed: not needed in MCP stdio/sse mode
+
+
+@asynccontextmanager
+async def _warmup_lifespan(server: "QdrantMCPServer"):
+    """
+    Warm up the embedding model when the server starts. By default this runs in the
+    background, without delaying the transport (e.g. the HTTP socket accepting
+    connections); MCP_EMBED_WARMUP=1 finishes it before serving instead, and
+    MCP_EMBED_WARMUP=0 disables it.
+    """
+    warmup = server.embedding_provider_settings.warmup
+    if warmup is True:
+        await server.warmup()
+    elif warmup is None and server._warmup_task is None:
+        server._warmup_task = asyncio.create_task(server.warmup())
+    try:
+        yield {}
+    finally:
+        if server._warmup_task is not None:
+            server._warmup_task.cancel()
+            server._warmup_task = None
+
+
+# --- Tool implementations ---
+# They live at module level, so every server instance shares the same function
+# objects; the `server` argument is bound per instance with make_partial_function.
+
+async def dummy_adapter(ctx: Context) -> List[str]:
+    logger.debug("[mcp_server.py] DUMMY ADAPTER called")
+    await ctx.debug("DUMMY ADAPTER called")
+    return [f"Dummy adapter response at {datetime.datetime.now(datetime.timezone.utc).isoformat()}"]
+
+
+async def memory_query_adapter(
+    server: QdrantMCPServer,
+    ctx: Context,
+    query: str,
+    top_k: int = 10,
+    collection_name: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> List[str]:
+    logger.debug(
+        "[mcp_server.py] memory_query_adapter START: query='%s', top_k=%s, collection_name=%s, user_id=%s",
+        query, top_k, collection_name, user_id,
+    )
+    await ctx.debug(f"memory_query_adapter START: query='{query}', top_k={top_k}, collection_name={collection_name}, user_id={user_id}")
+    # Nothing worth an embedding pass and a Qdrant round trip.
+    if len(query.strip()) < MIN_QUERY_LENGTH:
+        return [f"Query too short: '{query}'"]
+    if top_k <= 0:
+        return [f"No information found for the query '{query}'"]
+    if collection_name is None:
+        collection_name = "default"
+    try:
+        result = None
+        query_vector = None
+        cache = server.query_cache if server.qdrant_settings.query_cache_enabled else None
+        scope = (collection_name, top_k, user_id)
+        if cache is not None:
+            # Read before any await: an upsert finishing meanwhile makes the result stale.
+            generation = cache.generation(collection_name)
+            # Exact repeat first, then a near-duplicate of a recent query.
+            result = cache.get(query, scope)
+            if result is None:
+                query_vector = await _memory.get_query_vector(query)
+                result = cache.get_similar(query_vector, scope)
+        if result is None:
+            logger.debug("[mcp_server.py] About to call memory_query function...")
+            result = await _memory.memory_query(
+                query,
+                top_k=top_k,
+                collection_name=collection_name,
+                user_id=user_id,
+                query_vector=query_vector,
+            )
+            if cache is not None and query_vector is not None:
+                cache.put(query, scope, query_vector, result, generation)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[mcp_server.py] memory_query returned successfully: %s", result)
+
+        # memory_query already returns plain dicts with a metadata dict,
+        # so they are formatted directly instead of round-tripping through Entry.
+        hits = result["result"]
+
+        logger.debug("[mcp_server.py] Processed %d entries from memory_query", len(hits))
+
+        response = _format_hits(query, hits)
+        logger.debug("[mcp_server.py] memory_query_adapter END (%d items)", len(response))
+        return response
+    except Exception as e:
+        logger.exception("[mcp_server.py] Exception in memory_query_adapter: %s", e)
+        return [f"Error searching for '{query}': {str(e)}"]
+
+
+async def memory_query_batch_adapter(
+    server: QdrantMCPServer,
+    ctx: Context,
+    queries: List[str],
+    top_k: int = 10,
+    collection_name: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> List[str]:
+    logger.debug(
+        "[mcp_server.py] memory_query_batch_adapter START: %d queries, top_k=%s, collection_name=%s, user_id=%s",
+        len(queries), top_k, collection_name, user_id,
+    )
+    await ctx.debug(f"memory_query_batch_adapter START: {len(queries)} queries, top_k={top_k}, collection_name={collection_name}")
+    if top_k <= 0:
+        return [f"No information found for the query '{query}'" for query in queries]
+    if collection_name is None:
+        collection_name = "default"
+    # Too-short queries are answered without being embedded or searched.
+    searched = [query for query in queries if len(query.strip()) >= MIN_QUERY_LENGTH]
+    try:
+        result = await _memory.memory_query_batch(
+            searched, top_k=top_k, collection_name=collection_name, user_id=user_id
+        )
+    except Exception as e:
+        logger.exception("[mcp_server.py] Exception in memory_query_batch_adapter: %s", e)
+        return [f"Error searching for {len(queries)} queries: {str(e)}"]
+    hits_by_query = dict(zip(searched, result["results"]))
+    response = []
+    for query in queries:
+        hits = hits_by_query.get(query)
+        if hits is None:
+            response.append(f"Query too short: '{query}'")
+        else:
+            response.extend(_format_hits(query, hits))
+    logger.debug("[mcp_server.py] memory_query_batch_adapter END (%d items)", len(response))
+    return response
+
+
+def _format_hits(query: str, hits: List[dict]) -> List[str]:
+    """
+    Format the hits of one query as a header line followed by one line per hit.
+    """
+    if not hits:
+        return [f"No information found for the query '{query}'"]
+    fmt = _ENTRY_TMPL  # local binding: one global lookup instead of one per hit
+    # Built in place, rather than as [header] + [lines], which copies every line.
+    response = [f"Results for '{query}':"]
+    response.extend(
+        fmt(
+            hit["content"],
+            metadata.get("timestamp", "-"),
+            metadata.get("collection_name", "-"),
+        )
+        for hit in hits
+        for metadata in (hit["metadata"],)
+    )
+    return response
+
+
+async def memory_upsert_adapter(
+    server: QdrantMCPServer,
+    ctx: Context,
+    content: str,
+    collection_name: Optional[str] = None,
+    metadata: Optional[dict] = None,
+    id: Optional[str] = None,
+) -> List[str]:
+    logger.debug(
+        "[mcp_server.py] memory_upsert_adapter START: content='%s', collection_name=%s, metadata=%s, id=%s",
+        content, collection_name, metadata, id,
+    )
+    await ctx.debug(f"memory_upsert_adapter START: content='{content}', collection_name={collection_name}, metadata={metadata}, id={id}")
+    if collection_name is None:
+        collection_name = "default"
+    try:
+        result = await _memory.memory_upsert(content, collection_name=collection_name, metadata=metadata, id=id)
+        # Cached query results for this collection may now be missing the new entry.
+        server.query_cache.invalidate_collection(collection_name)
+        ts = result["metadata"].get("timestamp", "-")
+        logger.debug("[mcp_server.py] memory_upsert_adapter END (success): stored in '%s' ts=%s", collection_name, ts)
+        return [f"Successfully stored in collection '{collection_name}': '{content}' (timestamp: {ts})"]
+    except Exception as e:
+        logger.exception("[mcp_server.py] Exception in memory_upsert_adapter")
+        return [f"An error occurred: {str(e)}"]
@@ -2,50 +2,360 @@
 Fact Memory module for MCP Server Qdrant
 Implements memory_query and memory_upsert tools for long-term semantic memory.
 """
+import abc
+import asyncio
+import functools
 import uuid
-from typing import Dict, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 import logging
-import datetime
+import time
 
 from pydantic import BaseModel, Field
 
-from .embeddings.factory import create_embedding_provider
-from .qdrant import QdrantConnector, Entry
-from .settings import EmbeddingProviderSettings
+from .embeddings.base import EmbeddingProvider, Vector
+from .embeddings.factory import get_embedding_provider
+from .qdrant import QdrantConnector, Entry, _embed_sorted_by_length, get_qdrant_connector
+from .settings import EmbeddingProviderSettings, QdrantSettings
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 # --- Schemas ---
 
 def now_iso():
-    return datetime.datetime.utcnow().replace(microsecond=0).isoformat()
+    # UTC, to the second; same format as datetime.isoformat(), without the datetime objects.
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+
+# The settings are read once; the instances themselves are shared with the server
+# (see get_embedding_provider and get_qdrant_connector), so the model and the Qdrant
+# client exist once per process.
 
+@functools.lru_cache(maxsize=None)
 def get_default_embedding_provider():
-    # Singleton pattern for embedding provider
-    if not hasattr(get_default_embedding_provider, "_provider"):
-        settings = EmbeddingProviderSettings()
-        get_default_embedding_provider._provider = create_embedding_provider(settings)
-    return get_default_embedding_provider._provider
-
-def get_default_qdrant_client():
-    logger = logging.getLogger(__name__)
-    # Singleton pattern for QdrantConnector
-    if not hasattr(get_default_qdrant_client, "_client"):
-        from .settings import QdrantSettings
-        qdrant_settings = QdrantSettings()
-        embedding_provider = get_default_embedding_provider()
-        logger.info("[memory.py] Creating new QdrantConnector singleton instance.")
-        get_default_qdrant_client._client = QdrantConnector(
-            qdrant_url=getattr(qdrant_settings, 'qdrant_url', None),
-            qdrant_api_key=getattr(qdrant_settings, 'qdrant_api_key', None),
-            collection_name=getattr(qdrant_settings, 'collection_name', None),
-            embedding_provider=embedding_provider,
-            qdrant_local_path=getattr(qdrant_settings, 'qdrant_local_path', None),
+    return get_embedding_provider(EmbeddingProviderSettings())
+
+@functools.lru_cache(maxsize=None)
+def get_default_qdrant_client() -> QdrantConnector:
+    qdrant_settings = QdrantSettings()
+    return get_qdrant_connector(
+        qdrant_settings.location,
+        qdrant_settings.api_key,
+        qdrant_settings.collection_name,
+        get_default_embedding_provider(),
+        qdrant_settings.local_path,
+        EmbeddingProviderSettings().cache_path,
+        qdrant_settings.quantization,
+        qdrant_settings.quantization_always_ram,
+        qdrant_settings.pool_size,
+        qdrant_settings.prefer_grpc,
+    )
+
+# The pending (or finished) load of each default instance, with the loop it belongs to.
+_loads: Dict[Callable[[], Any], Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+
+async def _load_once(factory: Callable[[], Any]) -> Any:
+    """
+    Call a (cached) factory in an executor, at most once at a time: every caller waits
+    for the same call, instead of each running it, or running it on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    load = _loads.get(factory)
+    if load is None or load[0] is not loop or _failed(load[1]):
+        load = _loads[factory] = (loop, loop.run_in_executor(None, factory))
+    # Shielded, so a cancelled waiter (e.g. the warmup on shutdown) does not cancel
+    # the load for everyone else.
+    return await asyncio.shield(load[1])
+
+
+async def load_default_embedding_provider() -> EmbeddingProvider:
+    """
+    Get the default embedding provider, loading the model in an executor on first use.
+    The server warmup and the requests arriving during it share the same load.
+    """
+    return await _load_once(get_default_embedding_provider)
+
+
+async def load_default_qdrant_client() -> QdrantConnector:
+    """
+    Get the default Qdrant client, creating it in an executor on first use.
+    """
+    # The client is created with the provider; load that through the shared path first.
+    await load_default_embedding_provider()
+    return await _load_once(get_default_qdrant_client)
+
+
+def _failed(future: asyncio.Future) -> bool:
+    return future.done() and (future.cancelled() or future.exception() is not None)
+
+def point_id(memory_id: str) -> str:
+    """
+    The Qdrant point ID of a memory. Qdrant only accepts UUIDs (or integers), so any other
+    ID is mapped to a stable UUID derived from it; upserting the same ID replaces the memory.
+    """
+    try:
+        return str(uuid.UUID(memory_id))
+    except ValueError:
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, memory_id))
+
+# --- Query embeddings ---
+
+QUERY_VECTOR_CACHE_SIZE = 1024
+QUERY_VECTOR_CACHE_TTL = 3600
+
+# Embeddings of recent queries, keyed by (model, query text). An embedding does not
+# depend on the collection searched, so one entry serves every collection.
+_query_vectors = TTLCache(max_size=QUERY_VECTOR_CACHE_SIZE, ttl=QUERY_VECTOR_CACHE_TTL)
+
+
+async def get_query_vectors(queries: List[str]) -> List[Vector]:
+    """
+    Embed several queries, reusing cached embeddings and embedding the rest in one pass.
+    """
+    provider = await load_default_embedding_provider()
+    model = provider.get_vector_name()
+    texts = [query.strip() for query in queries]
+    keys = [(model, text) for text in texts]
+    vectors = [_query_vectors.get(key) for key in keys]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        # The stripped text is embedded, so the vector matches the key it is cached under.
+        embedded = await _embed_sorted_by_length(
+            provider.embed_queries, [texts[i] for i in missing]
+        )
+        for i, vector in zip(missing, embedded):
+            vectors[i] = vector
+            _query_vectors.put(keys[i], vector)
+    # Every missing entry is filled in above.
+    return cast(List[Vector], vectors)
+
+
+async def get_query_vector(query: str) -> Vector:
+    """
+    Embed a single query, reusing its cached embedding if there is one.
+    """
+    return (await get_query_vectors([query]))[0]
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Size, hits and misses of the process-local caches.
+    """
+    return {"query_vectors": _query_vectors.stats(), "query_results": _query_results.stats()}
+
+# --- Query results ---
+
+QUERY_RESULT_CACHE_SIZE = 512
+QUERY_RESULT_CACHE_TTL = 60
+
+# Results of recent memory_query calls, so that an agent repeating a query gets the
+# answer without an embedding pass or a Qdrant round-trip. Only used when enabled
+# (QDRANT_RESULT_CACHE_ENABLED): the short TTL bounds how stale a result can get
+# through writes that bypass memory_upsert, but does not prevent it.
+_query_results = TTLCache(max_size=QUERY_RESULT_CACHE_SIZE, ttl=QUERY_RESULT_CACHE_TTL)
+# Bumped by every upsert into a collection; keys from an older generation are never
+# looked up again and age out of the LRU, which invalidates without a scan.
+_collection_generations: Dict[str, int] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def query_results_enabled() -> bool:
+    return QdrantSettings().result_cache_enabled
+
+
+def _query_result_key(query: str, top_k: int, collection_name: str, user_id: Optional[str]):
+    generation = _collection_generations.get(collection_name, 0)
+    return (collection_name, generation, query.strip(), top_k, user_id)
+
+
+def invalidate_query_results(collection_name: str):
+    """
+    Forget the cached memory_query results of a collection.
+    """
+    _collection_generations[collection_name] = _collection_generations.get(collection_name, 0) + 1
+
+# --- Request batching ---
+
+class _MicroBatcher(abc.ABC):
+    """
+    Coalesces concurrent calls into batches. Requests are queued, and a background task
+    drains up to `max_batch` of them (or whatever arrived within `flush_ms` of the first
+    one) and hands them to `_flush`, with at most `max_concurrency` flushes in flight.
+    :param max_batch: The maximum number of requests flushed together.
+    :param flush_ms: How long to wait for more requests after the first one arrives.
+    :param max_concurrency: The maximum number of batches being flushed at the same time.
+    """
+
+    def __init__(self, max_batch: int = 32, flush_ms: float = 20, max_concurrency: int = 8):
+        self._max_batch = max_batch
+        self._flush_ms = flush_ms
+        self._max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Strong references to in-flight flushes, so they are not garbage collected.
+        self._flushes: set = set()
+
+    async def _submit(self, request: Any) -> Any:
+        """
+        Queue a request and wait for the result of the batch containing it.
+        """
+        loop = asyncio.get_running_loop()
+        # The drainer is started lazily, and restarted if the event loop changed.
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._task = loop.create_task(self._run(self._queue, self._semaphore))
+        assert self._queue is not None
+        future = loop.create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue, semaphore: asyncio.Semaphore):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self._flush_ms / 1000
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await semaphore.acquire()
+            flush = loop.create_task(self._flush_and_release(batch, semaphore))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush_and_release(self, batch: List[Tuple[Any, asyncio.Future]], semaphore: asyncio.Semaphore):
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            _fail(batch, e)
+        finally:
+            semaphore.release()
+
+    @abc.abstractmethod
+    async def _flush(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """
+        Process a batch, resolving (or failing) the future of every request in it.
+        """
+        pass
+
+
+def _resolve(items: List[Tuple[Any, asyncio.Future]], results: List[Any]):
+    for (_, future), result in zip(items, results):
+        if not future.done():
+            future.set_result(result)
+
+
+def _fail(items: List[Tuple[Any, asyncio.Future]], error: Exception):
+    for _, future in items:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _group_by_collection(batch: List[Tuple[Tuple, asyncio.Future]]) -> Dict[str, List[Tuple[Tuple, asyncio.Future]]]:
+    # Every request tuple carries its collection name as the second element.
+    groups: Dict[str, List[Tuple[Tuple, asyncio.Future]]] = {}
+    for request, future in batch:
+        groups.setdefault(request[1], []).append((request, future))
+    return groups
+
+
+class MemoryUpsertBatcher(_MicroBatcher):
+    """
+    Coalesces concurrent memory_upsert calls, so a burst of N upserts costs one embedding
+    pass and one Qdrant upsert per collection instead of N of each.
+    """
+
+    async def submit(self, entry: Entry, collection_name: str, point_id: Optional[str] = None) -> None:
+        """
+        Queue an entry for storage and wait until the batch containing it is stored.
+        """
+        await self._submit((entry, collection_name, point_id))
+
+    async def _flush(self, batch: List[Tuple[Tuple[Entry, str, Optional[str]], asyncio.Future]]):
+        # Collections are stored concurrently, over the client's connection pool.
+        await asyncio.gather(
+            *(
+                self._store(collection_name, items)
+                for collection_name, items in _group_by_collection(batch).items()
+            )
         )
-    else:
-        logger.info(f"[memory.py] Reusing QdrantConnector singleton instance: {get_default_qdrant_client._client}")
-    # Ellenőrizzük, hogy a _client attribútum él-e
-    qc = get_default_qdrant_client._client
-    logger.info(f"[memory.py] QdrantConnector._client: {getattr(qc, '_client', None)}")
-    return qc
+
+    async def _store(self, collection_name: str, items: List[Tuple[Tuple[Entry, str, Optional[str]], asyncio.Future]]):
+        try:
+            client = await load_default_qdrant_client()
+            await client.store_batch(
+                [entry for (entry, _, _), _ in items],
+                collection_name=collection_name,
+                point_ids=[point_id for (_, _, point_id), _ in items],
+            )
+        except Exception as e:
+            logger.error("[memory.py] Error during batched upsert into '%s': %s", collection_name, e)
+            _fail(items, e)
+        else:
+            _resolve(items, [None] * len(items))
+
+
+class MemoryQueryBatcher(_MicroBatcher):
+    """
+    Coalesces concurrent memory_query calls, so queries arriving together are embedded in
+    one pass and sent to Qdrant as one batched query per collection.
+    """
+
+    async def submit(
+        self,
+        query: str,
+        collection_name: str,
+        top_k: int,
+        query_vector: Optional[Vector] = None,
+    ) -> List[Entry]:
+        """
+        Queue a query and wait for its hits.
+        """
+        return await self._submit((query, collection_name, top_k, query_vector))
+
+    async def _flush(self, batch: List[Tuple[Tuple[str, str, int, Optional[Vector]], asyncio.Future]]):
+        # The queries of every collection are embedded in one pass, then the
+        # collections are searched concurrently, over the client's connection pool.
+        missing = [i for i, ((_, _, _, vector), _) in enumerate(batch) if vector is None]
+        if missing:
+            embedded = await get_query_vectors([batch[i][0][0] for i in missing])
+            for i, vector in zip(missing, embedded):
+                (query, collection_name, top_k, _), future = batch[i]
+                batch[i] = ((query, collection_name, top_k, vector), future)
+        await asyncio.gather(
+            *(
+                self._search(collection_name, items)
+                for collection_name, items in _group_by_collection(batch).items()
+            )
+        )
+
+    async def _search(self, collection_name: str, items: List[Tuple[Tuple[str, str, int, Vector], asyncio.Future]]):
+        requests = [request for request, _ in items]
+        try:
+            client = await load_default_qdrant_client()
+            results = await client.search_batch(
+                [query for query, _, _, _ in requests],
+                collection_name=collection_name,
+                limit=[top_k for _, _, top_k, _ in requests],
+                query_vectors=[vector for _, _, _, vector in requests],
+            )
+        except Exception as e:
+            logger.error("[memory.py] Error during batched search in '%s': %s", collection_name, e)
+            _fail(items, e)
+        else:
+            _resolve(items, results)
+
+
+_upsert_batcher = MemoryUpsertBatcher(flush_ms=20)
+_query_batcher = MemoryQueryBatcher(flush_ms=5)
 
 # --- memory_query ---
 async def memory_query(
@@ -53,39 +363,70 @@ async def memory_query(
     top_k: int = 10,
     collection_name: str = "default",
     user_id: Optional[str] = None,
+    query_vector: Optional[Vector] = None,
 ) -> Dict[str, Any]:
-    logger = logging.getLogger(__name__)
-    logger.info(f"[memory.py] memory_query called: query={query}, top_k={top_k}, collection_name={collection_name}, user_id={user_id}")
+    logger.debug(
+        "[memory.py] memory_query called: query=%s, top_k=%s, collection_name=%s, user_id=%s",
+        query, top_k, collection_name, user_id,
+    )
+    key = _query_result_key(query, top_k, collection_name, user_id)
+    cached = _query_results.get(key) if query_results_enabled() else None
+    if cached is not None:
+        logger.debug("[memory.py] memory_query served from the result cache.")
+        return cached
     try:
-        logger.info("[memory.py] About to get QdrantConnector client")
-        client = get_default_qdrant_client()
-        logger.info(f"[memory.py] memory_query using QdrantConnector: {client}, _client: {getattr(client, '_client', None)}")
-        logger.info("[memory.py] About to call client.search")
-        hits = await client.search(
-            query=query,
-            collection_name=collection_name,
-            limit=top_k
-        )
-        logger.info("[memory.py] client.search returned successfully")
+        # Concurrent queries are coalesced into one embedding pass and one Qdrant call.
+        hits = await _query_batcher.submit(query, collection_name, top_k, query_vector)
     except Exception as e:
-        logger.error(f"[memory.py] Error during search: {str(e)}")
+        logger.error("[memory.py] Error during search: %s", e)
         raise
-    logger.info(f"[memory.py] memory_query hits: {hits}")
-    result = []
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[memory.py] memory_query hits: %s", hits)
+    result = _hits_to_dicts(hits)
+    logger.debug("[memory.py] memory_query returning %d results.", len(result))
+    response = {"result": result}
+    if query_results_enabled():
+        _query_results.put(key, response)
+    return response
+
+# --- memory_query_batch ---
+async def memory_query_batch(
+    queries: List[str],
+    top_k: int = 10,
+    collection_name: str = "default",
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run several queries against one collection with a single embedding pass and a
+    single Qdrant request. The results are in the order of the queries.
+    """
+    logger.debug(
+        "[memory.py] memory_query_batch called: %d queries, top_k=%s, collection_name=%s, user_id=%s",
+        len(queries), top_k, collection_name, user_id,
+    )
+    if not queries:
+        return {"results": []}
+    vectors = await get_query_vectors(queries)
+    client = await load_default_qdrant_client()
+    hits = await client.search_batch(
+        queries, collection_name=collection_name, limit=top_k, query_vectors=vectors
+    )
+    return {"results": [_hits_to_dicts(query_hits) for query_hits in hits]}
+
+
+def _hits_to_dicts(hits: List[Entry]) -> List[Dict[str, Any]]:
+    # Qdrant returns the points ordered by score, best first, so no re-sort is needed.
+    result: List[Dict[str, Any]] = []
+    append = result.append
     for idx, hit in enumerate(hits):
-        content = getattr(hit, "content", "") or ""
-        metadata = getattr(hit, "metadata", {}) or {}
-        score = hit.score if hit.score is not None else 1.0
-        result.append({
+        score = hit.score
+        append({
             "id": str(idx),
-            "content": content,
-            "metadata": metadata,
-            "score": round(score, 4),
+            "content": hit.content or "",
+            "metadata": hit.metadata or {},
+            "score": round(score, 4) if score is not None else 1.0,
         })
-    # Sort by score descending
-    result.sort(key=lambda x: x["score"], reverse=True)
-    logger.info(f"[memory.py] memory_query returning {len(result)} results.")
-    return {"result": result}
+    return result
 
 # --- memory_upsert ---
 async def memory_upsert(
@@ -94,18 +435,21 @@ async def memory_upsert(
     metadata: Optional[Dict[str, Any]] = None,
     id: Optional[str] = None,
 ) -> Dict[str, Any]:
-    logger = logging.getLogger(__name__)
-    logger.info(f"[memory.py] memory_upsert called: content={content}, collection_name={collection_name}, id={id}")
-    client = get_default_qdrant_client()
-    logger.info(f"[memory.py] memory_upsert using QdrantConnector: {client}, _client: {getattr(client, '_client', None)}")
+    logger.debug(
+        "[memory.py] memory_upsert called: content=%s, collection_name=%s, id=%s",
+        content, collection_name, id,
+    )
     memory_id = id or str(uuid.uuid4())
     meta = dict(metadata or {})
-    meta.setdefault("timestamp", now_iso())
+    if "timestamp" not in meta:
+        meta["timestamp"] = now_iso()
     meta["content"] = content
     meta.setdefault("collection_name", collection_name)
     entry = Entry(content=content, metadata=meta)
-    await client.store(entry, collection_name=collection_name)
-    logger.info(f"[memory.py] memory_upsert stored entry: {entry}")
+    # The point is stored under this ID, so the returned ID identifies it for updates.
+    await _upsert_batcher.submit(entry, collection_name, point_id(memory_id))
+    invalidate_query_results(collection_name)
+    logger.debug("[memory.py] memory_upsert stored entry in '%s'", collection_name)
     return {
         "status": "success",
         "id": memory_id,
@@ -121,6 +465,12 @@ class MemoryQueryArgs(BaseModel):
     collection_name: str = Field("default", description="Memory collection name.")
     user_id: Optional[str] = Field(None, description="User ID to filter by.")
 
+class MemoryQueryBatchArgs(BaseModel):
+    queries: List[str] = Field(..., description="Free-text search queries.")
+    top_k: int = Field(10, description="Maximum results to return per query.")
+    collection_name: str = Field("default", description="Memory collection name.")
+    user_id: Optional[str] = Field(None, description="User ID to filter by.")
+
 class MemoryUpsertArgs(BaseModel):
     content: str = Field(..., description="Fact/memory to store.")
     collection_name: str = Field("default", description="Memory collection name.")
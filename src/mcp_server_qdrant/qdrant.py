@@ -1,15 +1,43 @@
+import asyncio
+import functools
 import logging
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Union, cast
 
+import numpy as np
 from pydantic import BaseModel
 from qdrant_client import AsyncQdrantClient, models
 
-from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from mcp_server_qdrant.embedding_cache import EmbeddingCache
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, Vector
 
 logger = logging.getLogger(__name__)
 
 Metadata = Dict[str, Any]
+Quantization = Literal["none", "scalar", "binary"]
+
+
+async def _embed_sorted_by_length(
+    embed: Callable[[List[str]], Awaitable[List[Vector]]], texts: List[str]
+) -> List[Vector]:
+    """
+    Embed the texts shortest first, so that each model batch pads to similar lengths,
+    and return the vectors in the original order.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embedded = await embed([texts[i] for i in order])
+    vectors: List[Vector] = [[] for _ in texts]
+    for i, vector in zip(order, embedded):
+        vectors[i] = vector
+    return vectors
+
+
+def _as_list(vector: Vector) -> List[float]:
+    """
+    Convert a vector to the plain list the Qdrant client expects. Arrays are only
+    kept in the in-process caches.
+    """
+    return vector.tolist() if isinstance(vector, np.ndarray) else vector
 
 
 class Entry(BaseModel):
@@ -31,6 +59,14 @@ class QdrantConnector:
                             the collection name to be provided.
     :param embedding_provider: The embedding provider to use.
     :param qdrant_local_path: The path to the storage directory for the Qdrant client, if local mode is used.
+    :param embedding_cache: A disk cache of document embeddings, so stored contents are not re-embedded.
+    :param quantization: The quantization of the vectors in the collections created by the connector.
+                         Searches are rescored with the original vectors, so ranking stays accurate.
+    :param quantization_always_ram: Whether the quantized vectors are kept in RAM, with the original
+                                    vectors on disk.
+    :param pool_size: The number of connections the client keeps to the Qdrant server, if not the
+                      client's default.
+    :param prefer_grpc: Whether to talk to the Qdrant server over gRPC (port 6334) instead of REST.
     """
 
     def __init__(
@@ -40,20 +76,51 @@ class QdrantConnector:
         collection_name: Optional[str],
         embedding_provider: EmbeddingProvider,
         qdrant_local_path: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        quantization: Quantization = "none",
+        quantization_always_ram: bool = True,
+        pool_size: Optional[int] = None,
+        prefer_grpc: bool = False,
     ):
-        logging.info(
-            f"[qdrant.py] Initializing QdrantConnector with url={qdrant_url}, collection={collection_name}"
+        logger.info(
+            "[qdrant.py] Initializing QdrantConnector with url=%s, collection=%s",
+            qdrant_url,
+            collection_name,
         )
         self._qdrant_url = qdrant_url.rstrip("/") if qdrant_url else None
         self._qdrant_api_key = qdrant_api_key
         self._default_collection_name = collection_name
         self._embedding_provider = embedding_provider
+        self._embedding_cache = embedding_cache
+        self._quantization = quantization
+        self._quantization_always_ram = quantization_always_ram
+        self._search_params = (
+            models.SearchParams(
+                quantization=models.QuantizationSearchParams(
+                    ignore=False, rescore=True, oversampling=2.0
+                )
+            )
+            if quantization != "none"
+            else None
+        )
+        # Concurrent requests are spread over the pool instead of queueing on one channel.
         self._client = AsyncQdrantClient(
-            location=qdrant_url, api_key=qdrant_api_key, path=qdrant_local_path
+            location=qdrant_url,
+            api_key=qdrant_api_key,
+            path=qdrant_local_path,
+            prefer_grpc=prefer_grpc,
+            pool_size=pool_size,
         )
 
+    async def initialize(self):
+        """
+        Create the default collection up front, if there is one, so the first store
+        does not pay for it.
+        """
+        if self._default_collection_name is not None:
+            await self._ensure_collection_exists(self._default_collection_name)
+
     async def get_collection_names(self) -> list[str]:
-        logging.info("[qdrant.py] Fetching collection names from Qdrant server...")
         """
         Get the names of all collections in the Qdrant server.
         :return: A list of collection names.
@@ -61,25 +128,30 @@ class QdrantConnector:
         response = await self._client.get_collections()
         return [collection.name for collection in response.collections]
 
-    async def store(self, entry: Entry, *, collection_name: Optional[str] = None):
-        logging.info(
-            f"[qdrant.py] Storing entry: {entry.content[:30]}... in collection: {collection_name or self._default_collection_name}"
-        )
-        logging.info(f"[qdrant.py] QdrantConnector.store: self._client={self._client}")
+    async def store(
+        self,
+        entry: Entry,
+        *,
+        collection_name: Optional[str] = None,
+        point_id: Optional[str] = None,
+    ):
         """
         Store some information in the Qdrant collection, along with the specified metadata.
         :param entry: The entry to store in the Qdrant collection.
         :param collection_name: The name of the collection to store the information in, optional. If not provided,
                                 the default collection is used.
+        :param point_id: The ID of the point (a UUID), optional. An existing point with the same ID is replaced.
+                         If not provided, a new ID is generated.
         """
         collection_name = collection_name or self._default_collection_name
         assert collection_name is not None
+        logger.debug("[qdrant.py] Storing entry in collection: %s", collection_name)
         await self._ensure_collection_exists(collection_name)
 
         # Embed the document
         # ToDo: instead of embedding text explicitly, use `models.Document`,
         # it should unlock usage of server-side inference.
-        embeddings = await self._embedding_provider.embed_documents([entry.content])
+        embeddings = await self._embed_documents([entry.content])
 
         # Add to Qdrant
         vector_name = self._embedding_provider.get_vector_name()
@@ -88,66 +160,219 @@ class QdrantConnector:
             collection_name=collection_name,
             points=[
                 models.PointStruct(
-                    id=uuid.uuid4().hex,
-                    vector={vector_name: embeddings[0]},
+                    id=point_id or uuid.uuid4().hex,
+                    vector={vector_name: _as_list(embeddings[0])},
                     payload=payload,
                 )
             ],
         )
 
+    async def store_batch(
+        self,
+        entries: list[Entry],
+        *,
+        collection_name: Optional[str] = None,
+        point_ids: Optional[list[Optional[str]]] = None,
+    ):
+        """
+        Store several entries in the Qdrant collection with a single embedding pass and a single upsert.
+        :param entries: The entries to store in the Qdrant collection.
+        :param collection_name: The name of the collection to store the information in, optional. If not provided,
+                                the default collection is used.
+        :param point_ids: The IDs of the points, in the order of the entries, optional. None (or no list at all)
+                          generates a new ID.
+        """
+        collection_name = collection_name or self._default_collection_name
+        logger.debug(
+            "[qdrant.py] Storing batch of %d entries in collection: %s",
+            len(entries),
+            collection_name,
+        )
+        assert collection_name is not None
+        if not entries:
+            return
+        await self._ensure_collection_exists(collection_name)
+
+        embeddings = await self._embed_documents([entry.content for entry in entries])
+
+        if point_ids is None:
+            point_ids = [None] * len(entries)
+        vector_name = self._embedding_provider.get_vector_name()
+        await self._client.upsert(
+            collection_name=collection_name,
+            points=[
+                models.PointStruct(
+                    id=point_id or uuid.uuid4().hex,
+                    vector={vector_name: _as_list(embedding)},
+                    payload={"document": entry.content, "metadata": entry.metadata},
+                )
+                for entry, embedding, point_id in zip(entries, embeddings, point_ids)
+            ],
+        )
+
     async def search(
-        self, query: str, *, collection_name: Optional[str] = None, limit: int = 10
+        self,
+        query: str,
+        *,
+        collection_name: Optional[str] = None,
+        limit: int = 10,
+        query_vector: Optional[Vector] = None,
     ) -> list[Entry]:
-        logging.info(
-            f"[qdrant.py] Searching for query: '{query}' in collection: {collection_name or self._default_collection_name}, limit: {limit}"
-        )
-        logging.info(f"[qdrant.py] QdrantConnector.search: self._client={self._client}")
         """
         Find points in the Qdrant collection. If there are no entries found, an empty list is returned.
         :param query: The query to use for the search.
         :param collection_name: The name of the collection to search in, optional. If not provided,
                                 the default collection is used.
         :param limit: The maximum number of entries to return.
+        :param query_vector: The embedding of the query, if the caller already computed it.
         :return: A list of entries found.
         """
+        collection_name = collection_name or self._default_collection_name
+        logger.debug(
+            "[qdrant.py] Searching for query: '%s' in collection: %s, limit: %d",
+            query,
+            collection_name,
+            limit,
+        )
         try:
-            collection_name = collection_name or self._default_collection_name
-            logging.info(f"[qdrant.py] Checking if collection exists: {collection_name}")
             collection_exists = await self._client.collection_exists(collection_name)
-            logging.info(f"[qdrant.py] Collection exists check result: {collection_exists}")
             if not collection_exists:
-                logging.warning(f"[qdrant.py] Collection does not exist: {collection_name}")
+                logger.warning("[qdrant.py] Collection does not exist: %s", collection_name)
                 return []
         except Exception as e:
-            logging.error(f"[qdrant.py] Error checking collection existence: {str(e)}")
+            logger.error("[qdrant.py] Error checking collection existence: %s", e)
             raise
 
         # Embed the query
         # ToDo: instead of embedding text explicitly, use `models.Document`,
         # it should unlock usage of server-side inference.
 
-        query_vector = await self._embedding_provider.embed_query(query)
+        if query_vector is None:
+            query_vector = await self._embedding_provider.embed_query(query)
         vector_name = self._embedding_provider.get_vector_name()
 
         # Search in Qdrant
         search_results = await self._client.query_points(
             collection_name=collection_name,
-            query=query_vector,
+            query=_as_list(query_vector),
             using=vector_name,
             limit=limit,
+            search_params=self._search_params,
         )
 
         return [
             Entry(
                 content=result.payload["document"],
                 metadata=result.payload.get("metadata"),
-                score=getattr(result, "score", None)  # relevancia score, ha van
+                score=result.score,
             )
             for result in search_results.points
         ]
 
+    async def search_batch(
+        self,
+        queries: list[str],
+        *,
+        collection_name: Optional[str] = None,
+        limit: Union[int, list[int]] = 10,
+        query_vectors: Optional[Sequence[Optional[Vector]]] = None,
+    ) -> list[list[Entry]]:
+        """
+        Run several searches in the Qdrant collection with a single embedding pass and a single request.
+        :param queries: The queries to use for the search.
+        :param collection_name: The name of the collection to search in, optional. If not provided,
+                                the default collection is used.
+        :param limit: The maximum number of entries to return, either for all queries or per query.
+        :param query_vectors: Embeddings of the queries already computed by the caller, with None for the
+                              ones that still need to be embedded.
+        :return: A list of entries found for each query, in the order of the queries.
+        """
+        collection_name = collection_name or self._default_collection_name
+        logger.debug(
+            "[qdrant.py] Searching for %d queries in collection: %s",
+            len(queries),
+            collection_name,
+        )
+        assert collection_name is not None
+        if not queries:
+            return []
+        if not await self._client.collection_exists(collection_name):
+            logger.warning("[qdrant.py] Collection does not exist: %s", collection_name)
+            return [[] for _ in queries]
+
+        limits = [limit] * len(queries) if isinstance(limit, int) else limit
+        vectors = list(query_vectors) if query_vectors is not None else [None] * len(queries)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embedded = await _embed_sorted_by_length(
+                self._embedding_provider.embed_queries, [queries[i] for i in missing]
+            )
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+        filled = cast(List[Vector], vectors)
+        vector_name = self._embedding_provider.get_vector_name()
+
+        responses = await self._client.query_batch_points(
+            collection_name=collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=_as_list(vector),
+                    using=vector_name,
+                    limit=query_limit,
+                    params=self._search_params,
+                    with_payload=True,
+                )
+                for vector, query_limit in zip(filled, limits)
+            ],
+        )
+
+        return [
+            [
+                Entry(
+                    content=result.payload["document"],
+                    metadata=result.payload.get("metadata"),
+                    score=result.score,
+                )
+                for result in response.points
+                # Every point is requested with its payload, this only narrows the type.
+                if result.payload is not None
+            ]
+            for response in responses
+        ]
+
+    async def _embed_documents(self, documents: List[str]) -> List[Vector]:
+        """
+        Embed documents, shortest first, reusing the cached embeddings of contents seen before.
+        :param documents: The documents to embed.
+        :return: The embeddings, in the order of the documents.
+        """
+        if self._embedding_cache is None:
+            return await _embed_sorted_by_length(
+                self._embedding_provider.embed_documents, documents
+            )
+        model = self._embedding_provider.get_vector_name()
+        # SQLite reads and commits block, so they run in an executor, off the event loop.
+        loop = asyncio.get_running_loop()
+        vectors: List[Optional[Vector]] = list(
+            await loop.run_in_executor(
+                None, self._embedding_cache.get_many, documents, model
+            )
+        )
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            texts = [documents[i] for i in missing]
+            embedded = await _embed_sorted_by_length(
+                self._embedding_provider.embed_documents, texts
+            )
+            await loop.run_in_executor(
+                None, self._embedding_cache.put_many, texts, model, embedded
+            )
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+        # Every missing entry is filled in above.
+        return cast(List[Vector], vectors)
+
     async def _ensure_collection_exists(self, collection_name: str):
-        logging.info(f"[qdrant.py] Ensuring collection exists: {collection_name}")
         """
         Ensure that the collection exists, creating it if necessary.
         :param collection_name: The name of the collection to ensure exists.
@@ -167,4 +392,54 @@ class QdrantConnector:
                         distance=models.Distance.COSINE,
                     )
                 },
+                quantization_config=self._quantization_config(),
+            )
+
+    def _quantization_config(self) -> Optional[models.QuantizationConfig]:
+        if self._quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=self._quantization_always_ram,
+                )
+            )
+        if self._quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(
+                    always_ram=self._quantization_always_ram
+                )
             )
+        return None
+
+
+@functools.lru_cache(maxsize=4)
+def get_qdrant_connector(
+    qdrant_url: Optional[str],
+    qdrant_api_key: Optional[str],
+    collection_name: Optional[str],
+    embedding_provider: EmbeddingProvider,
+    qdrant_local_path: Optional[str] = None,
+    embedding_cache_path: Optional[str] = None,
+    quantization: Quantization = "none",
+    quantization_always_ram: bool = True,
+    pool_size: Optional[int] = None,
+    prefer_grpc: bool = False,
+) -> QdrantConnector:
+    """
+    Return the shared connector for these parameters, creating it on first use, so
+    every caller (and every server instance) reuses one client and its connections.
+    The parameters are those of QdrantConnector, with the embedding cache given by path.
+    """
+    return QdrantConnector(
+        qdrant_url,
+        qdrant_api_key,
+        collection_name,
+        embedding_provider,
+        qdrant_local_path,
+        embedding_cache=EmbeddingCache(embedding_cache_path) if embedding_cache_path else None,
+        quantization=quantization,
+        quantization_always_ram=quantization_always_ram,
+        pool_size=pool_size,
+        prefer_grpc=prefer_grpc,
+    )
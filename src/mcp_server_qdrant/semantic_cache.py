@@ -0,0 +1,195 @@
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+from mcp_server_qdrant.embeddings.base import Vector
+
+Scope = Tuple[Hashable, ...]
+
+# SimSIMD has native half-precision kernels, which also halves the cache's memory.
+VECTOR_DTYPE = np.float16 if simsimd is not None else np.float32
+
+
+def cosine_similarities(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of `vector` to every row of `matrix`, using SimSIMD if it is
+    installed and a NumPy matrix-vector product (rows assumed normalized) otherwise.
+    """
+    if simsimd is not None:
+        distances = simsimd.cdist(vector[np.newaxis, :], matrix, metric="cosine")
+        return 1.0 - np.asarray(distances, dtype=np.float32).reshape(-1)
+    return matrix @ vector
+
+
+class SemanticQueryCache:
+    """
+    An LRU cache of query results. A cached result is reused when the same query text is
+    asked again, or when the embedding of a new query is close enough (cosine similarity)
+    to the embedding of a cached one. Results are only shared within the same scope.
+    :param max_size: The maximum number of cached queries.
+    :param threshold: The minimum cosine similarity for a cached query to be reused.
+    :param ttl: The number of seconds a result stays valid after it is stored.
+    """
+
+    def __init__(self, max_size: int = 1024, threshold: float = 0.95, ttl: float = 300):
+        self._max_size = max_size
+        self._threshold = threshold
+        self._ttl = ttl
+        # One row per cache slot; rows are L2-normalized query embeddings.
+        self._vectors: Optional[np.ndarray] = None
+        self._scope_ids = np.full(max_size, -1, dtype=np.int64)
+        self._last_used = np.zeros(max_size, dtype=np.int64)
+        # Expiry of each slot on the monotonic clock, as in TTLCache.
+        self._expires_at = np.zeros(max_size, dtype=np.float64)
+        self._keys: List[Optional[Tuple[str, Scope]]] = [None] * max_size
+        self._values: List[Any] = [None] * max_size
+        self._slots: Dict[Tuple[str, Scope], int] = {}
+        self._scopes: Dict[Scope, int] = {}
+        self._next_scope_id = 0
+        self._clock = 0
+        # Bumped by invalidate_collection; see generation().
+        self._generations: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, query: str, scope: Scope) -> Optional[Any]:
+        """
+        Return the cached result for exactly this query text, if any.
+        """
+        slot = self._slots.get((query, scope))
+        if slot is None:
+            return None
+        if self._expires_at[slot] < time.monotonic():
+            self._evict(slot)
+            return None
+        self._touch(slot)
+        return self._values[slot]
+
+    def get_similar(self, vector: Vector, scope: Scope) -> Optional[Any]:
+        """
+        Return the cached result of the most similar query in the same scope, if its
+        cosine similarity to `vector` reaches the threshold.
+        """
+        scope_id = self._scopes.get(scope)
+        if scope_id is None or self._vectors is None:
+            return None
+        query = self._normalize(vector)
+        if query.shape[0] != self._vectors.shape[1]:
+            return None
+        # All similarities in a single call.
+        similarities = cosine_similarities(self._vectors, query)
+        similarities[self._scope_ids != scope_id] = -np.inf
+        similarities[self._expires_at < time.monotonic()] = -np.inf
+        slot = int(np.argmax(similarities))
+        if similarities[slot] < self._threshold:
+            return None
+        self._touch(slot)
+        return self._values[slot]
+
+    def generation(self, collection_name: Hashable) -> int:
+        """
+        The number of times the collection has been invalidated. Read it before computing
+        a result and pass it to put(), so a result computed before an invalidation (an
+        upsert that finished while the query was running) is not cached.
+        """
+        return self._generations.get(collection_name, 0)
+
+    def put(
+        self,
+        query: str,
+        scope: Scope,
+        vector: Vector,
+        value: Any,
+        generation: Optional[int] = None,
+    ):
+        """
+        Cache the result of a query, evicting the least recently used entry if full.
+        If `generation` is given and the scope's collection has been invalidated since,
+        the result is stale and is not cached.
+        """
+        if generation is not None and generation != self.generation(scope[0]):
+            return
+        normalized = self._normalize(vector)
+        if self._vectors is None or self._vectors.shape[1] != normalized.shape[0]:
+            # First insert, or the embedding model changed: start over.
+            self.clear()
+            self._vectors = np.zeros(
+                (self._max_size, normalized.shape[0]), dtype=VECTOR_DTYPE
+            )
+
+        key = (query, scope)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._free_slot()
+        self._vectors[slot] = normalized
+        scope_id = self._scopes.get(scope)
+        if scope_id is None:
+            scope_id = self._scopes[scope] = self._next_scope_id
+            self._next_scope_id += 1
+        self._scope_ids[slot] = scope_id
+        self._expires_at[slot] = time.monotonic() + self._ttl
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._slots[key] = slot
+        self._touch(slot)
+
+    def invalidate_collection(self, collection_name: str):
+        """
+        Drop every cached result whose scope belongs to the given collection. Scopes are
+        tuples whose first element is the collection name.
+        """
+        self._generations[collection_name] = self.generation(collection_name) + 1
+        for scope, scope_id in list(self._scopes.items()):
+            if scope[0] != collection_name:
+                continue
+            for slot in np.flatnonzero(self._scope_ids == scope_id):
+                self._evict(int(slot))
+            del self._scopes[scope]
+
+    def clear(self):
+        self._vectors = None
+        self._scope_ids.fill(-1)
+        self._last_used.fill(0)
+        self._expires_at.fill(0)
+        self._keys = [None] * self._max_size
+        self._values = [None] * self._max_size
+        self._slots.clear()
+        self._scopes.clear()
+
+    def _free_slot(self) -> int:
+        if len(self._slots) < self._max_size:
+            return int(np.flatnonzero(self._scope_ids == -1)[0])
+        slot = int(np.argmin(self._last_used))
+        self._evict(slot)
+        return slot
+
+    def _evict(self, slot: int):
+        key = self._keys[slot]
+        if key is not None:
+            del self._slots[key]
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._scope_ids[slot] = -1
+        self._last_used[slot] = 0
+        self._expires_at[slot] = 0
+        if self._vectors is not None:
+            self._vectors[slot] = 0
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    @staticmethod
+    def _normalize(vector: Vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        if norm:
+            array = array / norm
+        return array.astype(VECTOR_DTYPE, copy=False)
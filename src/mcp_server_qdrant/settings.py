@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -44,6 +44,11 @@ class EmbeddingProviderSettings(BaseSettings):
         default="sentence-transformers/all-MiniLM-L6-v2",
         validation_alias="EMBEDDING_MODEL",
     )
+    cache_path: Optional[str] = Field(
+        default=None, validation_alias="EMBEDDING_CACHE_PATH"
+    )
+    # None warms the model up in the background, True before serving, False never.
+    warmup: Optional[bool] = Field(default=None, validation_alias="MCP_EMBED_WARMUP")
 
 
 class QdrantSettings(BaseSettings):
@@ -61,3 +66,22 @@ class QdrantSettings(BaseSettings):
     )
     search_limit: int = Field(default=10, validation_alias="QDRANT_SEARCH_LIMIT")
     read_only: bool = Field(default=False, validation_alias="QDRANT_READ_ONLY")
+    query_cache_enabled: bool = Field(
+        default=False, validation_alias="QDRANT_QCACHE_ENABLED"
+    )
+    query_cache_size: int = Field(default=1024, validation_alias="QDRANT_QCACHE_SIZE")
+    query_cache_threshold: float = Field(
+        default=0.95, validation_alias="QDRANT_QCACHE_THRESHOLD"
+    )
+    query_cache_ttl: float = Field(default=300, validation_alias="QDRANT_QCACHE_TTL")
+    result_cache_enabled: bool = Field(
+        default=False, validation_alias="QDRANT_RESULT_CACHE_ENABLED"
+    )
+    quantization: Literal["none", "scalar", "binary"] = Field(
+        default="none", validation_alias="QDRANT_QUANTIZATION"
+    )
+    quantization_always_ram: bool = Field(
+        default=True, validation_alias="QDRANT_QUANTIZATION_ALWAYS_RAM"
+    )
+    pool_size: Optional[int] = Field(default=None, validation_alias="QDRANT_POOL_SIZE")
+    prefer_grpc: bool = Field(default=False, validation_alias="QDRANT_PREFER_GRPC")
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    A least recently used cache whose entries also expire after a fixed time.
+    It is not thread-safe; it is meant to be used from the event loop.
+    :param max_size: The maximum number of entries.
+    :param ttl: The number of seconds an entry stays valid after it is stored.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        self._max_size = max_size
+        self._ttl = ttl
+        # key -> (expiry on the monotonic clock, value), least recently used first.
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the value stored for the key, or None if it is missing or expired.
+        """
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+        """
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,67 @@
+import hashlib
+from typing import List
+
+import numpy as np
+import pytest
+
+from mcp_server_qdrant import memory
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, Vector
+from mcp_server_qdrant.qdrant import QdrantConnector
+from mcp_server_qdrant.ttl_cache import TTLCache
+
+
+class StubProvider(EmbeddingProvider):
+    """Deterministic embeddings derived from a hash of the text; no model is loaded."""
+
+    def __init__(self):
+        self.embedded_queries: List[str] = []
+        self.embedded_documents: List[str] = []
+
+    @staticmethod
+    def _vector(text: str) -> np.ndarray:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()[:8]
+        return np.frombuffer(digest, dtype=np.uint8).astype(np.float32) + 1.0
+
+    async def embed_documents(self, documents: List[str]) -> List[Vector]:
+        self.embedded_documents.extend(documents)
+        return [self._vector(document) for document in documents]
+
+    async def embed_query(self, query: str) -> np.ndarray:
+        self.embedded_queries.append(query)
+        return self._vector(query)
+
+    async def embed_queries(self, queries: List[str]) -> List[Vector]:
+        self.embedded_queries.extend(queries)
+        return [self._vector(query) for query in queries]
+
+    def get_vector_name(self) -> str:
+        return "stub"
+
+    def get_vector_size(self) -> int:
+        return 8
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Fixture to provide a stub embedding provider as the memory tools' default."""
+    provider = StubProvider()
+    monkeypatch.setattr(memory, "get_default_embedding_provider", lambda: provider)
+    # Fresh process-wide caches, so hit counts and cached results don't leak between tests.
+    monkeypatch.setattr(memory, "_query_vectors", TTLCache())
+    monkeypatch.setattr(memory, "_query_results", TTLCache())
+    monkeypatch.setattr(memory, "_collection_generations", {})
+    monkeypatch.setattr(memory, "_loads", {})
+    return provider
+
+
+@pytest.fixture
+def connector(provider, monkeypatch):
+    """Fixture to provide an in-memory QdrantConnector as the memory tools' default."""
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name="default",
+        embedding_provider=provider,
+    )
+    monkeypatch.setattr(memory, "get_default_qdrant_client", lambda: connector)
+    return connector
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from mcp_server_qdrant.embedding_cache import EmbeddingCache
+from mcp_server_qdrant.qdrant import Entry, QdrantConnector
+
+
+def as_lists(vectors):
+    return [None if vector is None else vector.tolist() for vector in vectors]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    yield cache
+    cache.close()
+
+
+class TestEmbeddingCache:
+    def test_roundtrip(self, cache):
+        """Test that stored embeddings are returned, and missing ones are None."""
+        cache.put_many(["fox", "dog"], "model-a", [[1.0, 0.5], [0.25, -1.0]])
+
+        assert as_lists(cache.get_many(["dog", "cat", "fox"], "model-a")) == [
+            [0.25, -1.0],
+            None,
+            [1.0, 0.5],
+        ]
+
+    def test_keyed_by_model(self, cache):
+        """Test that an embedding from one model is not reused for another."""
+        cache.put_many(["fox"], "model-a", [[1.0, 0.0]])
+
+        assert cache.get_many(["fox"], "model-b") == [None]
+
+    def test_persists(self, tmp_path):
+        """Test that embeddings survive reopening the database."""
+        path = str(tmp_path / "embeddings.db")
+        cache = EmbeddingCache(path)
+        cache.put_many(["fox"], "model-a", [[0.5, 0.5]])
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+        assert as_lists(reopened.get_many(["fox"], "model-a")) == [[0.5, 0.5]]
+        reopened.close()
+
+
+class ThreadRecordingCache(EmbeddingCache):
+    """Records the threads the cache is called from."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.threads = set()
+
+    def get_many(self, contents, model):
+        self.threads.add(threading.get_ident())
+        return super().get_many(contents, model)
+
+    def put_many(self, contents, model, vectors):
+        self.threads.add(threading.get_ident())
+        return super().put_many(contents, model, vectors)
+
+
+async def test_connector_reuses_cached_embeddings_off_the_loop(provider, tmp_path):
+    """Test that the connector embeds a stored content once, and uses the cache from an executor thread."""
+    cache = ThreadRecordingCache(str(tmp_path / "embeddings.db"))
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name="default",
+        embedding_provider=provider,
+        embedding_cache=cache,
+    )
+
+    await connector.store(Entry(content="fox fact"))
+    await connector.store(Entry(content="fox fact"))
+
+    assert provider.embedded_documents == ["fox fact"]
+    assert cache.threads and threading.get_ident() not in cache.threads
+    cache.close()
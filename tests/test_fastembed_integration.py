@@ -43,8 +43,9 @@ class TestFastEmbedProviderIntegration:
 
         embedding = await provider.embed_query(query)
 
-        # Check that embedding has the expected shape
+        # Check that embedding has the expected shape and type
         assert len(embedding) > 0
+        assert embedding.dtype == np.float32
 
         # Embed the same query again to check consistency
         embedding2 = await provider.embed_query(query)
@@ -53,6 +54,19 @@ class TestFastEmbedProviderIntegration:
         # The embeddings should be identical for the same input
         np.testing.assert_array_almost_equal(np.array(embedding), np.array(embedding2))
 
+    async def test_embed_queries(self):
+        """Test that a batch of queries embeds the same as one query at a time."""
+        provider = FastEmbedProvider("sentence-transformers/all-MiniLM-L6-v2")
+        queries = ["This is a test query.", "Another, longer test query."]
+
+        embeddings = await provider.embed_queries(queries)
+
+        assert len(embeddings) == len(queries)
+        for query, embedding in zip(queries, embeddings):
+            np.testing.assert_array_almost_equal(
+                np.array(embedding), np.array(await provider.embed_query(query))
+            )
+
     async def test_get_vector_name(self):
         """Test that the vector name is generated correctly."""
         provider = FastEmbedProvider("sentence-transformers/all-MiniLM-L6-v2")
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+from mcp_server_qdrant import memory
+from mcp_server_qdrant.mcp_server import (
+    QdrantMCPServer,
+    _warmup_lifespan,
+    memory_query_adapter,
+    memory_upsert_adapter,
+)
+from mcp_server_qdrant.settings import (
+    EmbeddingProviderSettings,
+    QdrantSettings,
+    ToolSettings,
+)
+
+
+class StubContext:
+    """Stands in for the FastMCP request context, which the adapters only log to."""
+
+    async def debug(self, message: str):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture to provide a server with the semantic query cache enabled."""
+    qdrant_settings = QdrantSettings()
+    qdrant_settings.query_cache_enabled = True
+    return QdrantMCPServer(ToolSettings(), qdrant_settings, EmbeddingProviderSettings())
+
+
+async def test_query_cached_until_upsert(server, connector):
+    """Test that a repeated query is served from the semantic cache until an upsert."""
+    ctx = StubContext()
+    await memory_upsert_adapter(server, ctx, "fox fact", collection_name="c1")
+    first = await memory_query_adapter(
+        server, ctx, "fox", top_k=5, collection_name="c1"
+    )
+
+    assert len(server.query_cache) == 1
+    assert (
+        await memory_query_adapter(server, ctx, "fox", top_k=5, collection_name="c1")
+        == first
+    )
+
+    await memory_upsert_adapter(server, ctx, "another fox fact", collection_name="c1")
+    assert len(server.query_cache) == 0
+    response = await memory_query_adapter(
+        server, ctx, "fox", top_k=5, collection_name="c1"
+    )
+    assert "• another fox fact" in "\n".join(response)
+
+
+async def test_upsert_during_query_not_cached_stale(server, connector, monkeypatch):
+    """Test that a query that read the collection before a concurrent upsert does not cache its result."""
+    ctx = StubContext()
+    search_batch = connector.search_batch
+
+    async def slow_search_batch(*args, **kwargs):
+        # Read the collection now, but answer only after the upsert has finished.
+        results = await search_batch(*args, **kwargs)
+        await asyncio.sleep(0.1)
+        return results
+
+    monkeypatch.setattr(connector, "search_batch", slow_search_batch)
+    stale, _ = await asyncio.gather(
+        memory_query_adapter(
+            server, ctx, "brand new fact", top_k=5, collection_name="c1"
+        ),
+        memory_upsert_adapter(server, ctx, "brand new fact", collection_name="c1"),
+    )
+    assert stale == ["No information found for the query 'brand new fact'"]
+
+    response = await memory_query_adapter(
+        server, ctx, "brand new fact", top_k=5, collection_name="c1"
+    )
+    assert response[0] == "Results for 'brand new fact':"
+
+
+@pytest.fixture
+def slow_model_load(provider, connector, monkeypatch):
+    """Fixture to make loading the embedding model take a while, counting the loads."""
+    loads = []
+
+    def load():
+        loads.append(time.monotonic())
+        time.sleep(0.3)
+        return provider
+
+    monkeypatch.setattr(memory, "get_default_embedding_provider", load)
+    return loads
+
+
+async def test_request_during_warmup_shares_the_load(server, slow_model_load):
+    """Test that a request arriving during the warmup waits for it, without loading again or blocking the loop."""
+    loop = asyncio.get_running_loop()
+    gaps = []
+
+    async def ticker():
+        last = loop.time()
+        while True:
+            await asyncio.sleep(0.01)
+            gaps.append(loop.time() - last)
+            last = loop.time()
+
+    ticking = asyncio.create_task(ticker())
+    warmup = asyncio.create_task(server.warmup())
+    await asyncio.sleep(0.05)
+    await memory.get_query_vectors(["fox"])
+    await warmup
+    ticking.cancel()
+
+    assert len(slow_model_load) == 1
+    assert max(gaps) < 0.2
+
+
+async def test_lifespan_cancels_warmup(server, slow_model_load):
+    """Test that leaving the lifespan cancels a running warmup, without failing the shared load."""
+    async with _warmup_lifespan(server):
+        task = server._warmup_task
+        await asyncio.sleep(0.05)
+
+    assert server._warmup_task is None
+    await asyncio.sleep(0)
+    assert task.cancelled()
+    assert await memory.load_default_qdrant_client() is not None
+    assert len(slow_model_load) == 1
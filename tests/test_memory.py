@@ -0,0 +1,250 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+import pytest
+
+from mcp_server_qdrant import memory
+from mcp_server_qdrant.qdrant import Entry
+
+
+async def test_query_vectors_embed_stripped_text(provider):
+    """Test that a query is embedded as the stripped text it is cached under."""
+    await memory.get_query_vectors(["  fox  "])
+    await memory.get_query_vectors(["fox"])
+
+    assert provider.embedded_queries == ["fox"]
+
+
+class StubConnector:
+    """Records the batched calls the memory batchers make, without a Qdrant server."""
+
+    def __init__(self, delay: float = 0.0, failing_collection: Optional[str] = None):
+        self.delay = delay
+        self.failing_collection = failing_collection
+        self.searches: List[Tuple[str, List[str], List[int]]] = []
+        self.stores: List[Tuple[str, List[str], List[Optional[str]]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call(self, collection_name: str):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if collection_name == self.failing_collection:
+            raise RuntimeError(f"{collection_name} is down")
+
+    async def search_batch(self, queries, *, collection_name, limit, query_vectors):
+        self.searches.append((collection_name, list(queries), list(limit)))
+        await self._call(collection_name)
+        return [[Entry(content=f"{collection_name}:{query}")] for query in queries]
+
+    async def store_batch(self, entries, *, collection_name, point_ids):
+        self.stores.append(
+            (collection_name, [entry.content for entry in entries], list(point_ids))
+        )
+        await self._call(collection_name)
+
+
+@pytest.fixture
+def stub_connector(provider, monkeypatch):
+    """Fixture to provide a StubConnector as the memory tools' default."""
+    connector = StubConnector()
+    monkeypatch.setattr(memory, "get_default_qdrant_client", lambda: connector)
+    return connector
+
+
+class TestMicroBatchers:
+    def test_batcher_is_abstract(self):
+        """Test that a batcher without a _flush cannot be instantiated."""
+        with pytest.raises(TypeError):
+            memory._MicroBatcher()
+
+    async def test_query_results_in_request_order(self, stub_connector):
+        """Test that every caller gets the hits of its own query, whatever the batch order."""
+        batcher = memory.MemoryQueryBatcher(flush_ms=20)
+        queries = [f"query {i}" for i in range(10)]
+
+        results = await asyncio.gather(
+            *(batcher.submit(query, "c1", 3) for query in queries)
+        )
+
+        assert [hits[0].content for hits in results] == [
+            f"c1:{query}" for query in queries
+        ]
+        assert len(stub_connector.searches) == 1
+
+    async def test_query_grouped_by_collection(self, provider, stub_connector):
+        """Test that one batch is embedded once and searched once per collection."""
+        batcher = memory.MemoryQueryBatcher(flush_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit("fox", "c1", 1),
+            batcher.submit("dog", "c2", 2),
+            batcher.submit("cat", "c1", 3),
+        )
+
+        assert [hits[0].content for hits in results] == ["c1:fox", "c2:dog", "c1:cat"]
+        assert sorted(stub_connector.searches) == [
+            ("c1", ["fox", "cat"], [1, 3]),
+            ("c2", ["dog"], [2]),
+        ]
+        assert sorted(provider.embedded_queries) == ["cat", "dog", "fox"]
+
+    async def test_query_reuses_given_vector(self, provider, stub_connector):
+        """Test that a query submitted with its vector is not embedded again."""
+        batcher = memory.MemoryQueryBatcher(flush_ms=1)
+
+        await batcher.submit("fox", "c1", 1, query_vector=provider._vector("fox"))
+
+        assert provider.embedded_queries == []
+
+    async def test_error_fans_out_per_collection(self, stub_connector):
+        """Test that a failed search fails every caller of that collection, and only them."""
+        stub_connector.failing_collection = "bad"
+        batcher = memory.MemoryQueryBatcher(flush_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit("fox", "bad", 1),
+            batcher.submit("dog", "good", 1),
+            batcher.submit("cat", "bad", 1),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1][0].content == "good:dog"
+        assert isinstance(results[2], RuntimeError)
+
+    async def test_flush_error_fails_whole_batch(self, stub_connector, monkeypatch):
+        """Test that an error outside the per-collection calls fails every request of the batch."""
+        get_query_vectors = memory.get_query_vectors
+        failures = [RuntimeError("embedding failed")]
+
+        async def fail_once(queries):
+            if failures:
+                raise failures.pop()
+            return await get_query_vectors(queries)
+
+        monkeypatch.setattr(memory, "get_query_vectors", fail_once)
+        batcher = memory.MemoryQueryBatcher(flush_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit("fox", "c1", 1),
+            batcher.submit("dog", "c2", 1),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        # The batcher keeps serving after a failed batch.
+        assert (await batcher.submit("cat", "c1", 1))[0].content == "c1:cat"
+
+    @pytest.mark.parametrize("max_concurrency", [1, 2])
+    async def test_concurrent_flushes_bounded(self, stub_connector, max_concurrency):
+        """Test that no more than max_concurrency batches are flushed at the same time."""
+        stub_connector.delay = 0.02
+        batcher = memory.MemoryQueryBatcher(
+            max_batch=1, flush_ms=0, max_concurrency=max_concurrency
+        )
+
+        await asyncio.gather(*(batcher.submit(f"query {i}", "c1", 1) for i in range(6)))
+
+        assert len(stub_connector.searches) == 6
+        assert stub_connector.max_in_flight == max_concurrency
+
+    async def test_max_batch(self, stub_connector):
+        """Test that a burst larger than max_batch is split into several batches."""
+        batcher = memory.MemoryQueryBatcher(max_batch=4, flush_ms=20)
+
+        await asyncio.gather(
+            *(batcher.submit(f"query {i}", "c1", 1) for i in range(10))
+        )
+
+        assert [len(queries) for _, queries, _ in stub_connector.searches] == [4, 4, 2]
+
+    async def test_upsert_grouped_by_collection(self, stub_connector):
+        """Test that concurrent upserts are stored with one call per collection, keeping their IDs."""
+        batcher = memory.MemoryUpsertBatcher(flush_ms=20)
+
+        await asyncio.gather(
+            batcher.submit(Entry(content="fox"), "c1", "id-1"),
+            batcher.submit(Entry(content="dog"), "c2", "id-2"),
+            batcher.submit(Entry(content="cat"), "c1", None),
+        )
+
+        assert sorted(stub_connector.stores) == [
+            ("c1", ["fox", "cat"], ["id-1", None]),
+            ("c2", ["dog"], ["id-2"]),
+        ]
+
+    async def test_upsert_error_fans_out(self, stub_connector):
+        """Test that a failed store fails the upserts of that collection only."""
+        stub_connector.failing_collection = "bad"
+        batcher = memory.MemoryUpsertBatcher(flush_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit(Entry(content="fox"), "bad"),
+            batcher.submit(Entry(content="dog"), "good"),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] is None
+
+
+class TestMemoryTools:
+    async def test_query_result_cache_disabled_by_default(self, connector, monkeypatch):
+        """Test that memory_query results are not cached unless the result cache is enabled."""
+        monkeypatch.setattr(memory, "query_results_enabled", lambda: False)
+        await memory.memory_upsert("fox fact", collection_name="c1")
+        first = await memory.memory_query("fox", top_k=5, collection_name="c1")
+
+        assert (
+            await memory.memory_query("fox", top_k=5, collection_name="c1") is not first
+        )
+        assert memory._query_results.stats()["size"] == 0
+
+    async def test_query_result_cache_invalidated_by_upsert(
+        self, connector, monkeypatch
+    ):
+        """Test that an upsert makes the next identical query miss, in that collection only."""
+        monkeypatch.setattr(memory, "query_results_enabled", lambda: True)
+        await memory.memory_upsert("fox fact", collection_name="c1")
+        await memory.memory_upsert("fox fact", collection_name="c2")
+        first = await memory.memory_query("fox", top_k=5, collection_name="c1")
+        await memory.memory_query("fox", top_k=5, collection_name="c2")
+
+        assert await memory.memory_query("fox", top_k=5, collection_name="c1") is first
+        assert memory._query_results.hits == 1
+
+        await memory.memory_upsert("fox fact two", collection_name="c1")
+        result = await memory.memory_query("fox", top_k=5, collection_name="c1")
+        assert memory._query_results.hits == 1
+        assert sorted(hit["content"] for hit in result["result"]) == [
+            "fox fact",
+            "fox fact two",
+        ]
+
+        await memory.memory_query("fox", top_k=5, collection_name="c2")
+        assert memory._query_results.hits == 2
+
+    async def test_upsert_with_id_replaces_memory(self, connector):
+        """Test that a non-UUID ID maps to a stable point ID, so upserting it again replaces the memory."""
+        assert memory.point_id("note-1") == memory.point_id("note-1")
+        assert memory.point_id("note-1") != memory.point_id("note-2")
+        uuid_id = "0b6a3b8e-7c1f-4d2a-9c3e-5f4a1b2c3d4e"
+        assert memory.point_id(uuid_id) == uuid_id
+
+        first = await memory.memory_upsert(
+            "old fact", collection_name="c1", id="note-1"
+        )
+        await memory.memory_upsert("new fact", collection_name="c1", id="note-1")
+        await memory.memory_upsert("other fact", collection_name="c1", id="note-2")
+
+        assert first["id"] == "note-1"
+        result = await memory.memory_query("fact", top_k=10, collection_name="c1")
+        assert sorted(hit["content"] for hit in result["result"]) == [
+            "new fact",
+            "other fact",
+        ]
@@ -1,6 +1,7 @@
 import uuid
 
 import pytest
+from qdrant_client import models
 
 from mcp_server_qdrant.embeddings.fastembed import FastEmbedProvider
 from mcp_server_qdrant.qdrant import Entry, QdrantConnector
@@ -92,6 +93,71 @@ async def test_multiple_entries(qdrant_connector):
     assert any("machine learning" in result.content.lower() for result in ai_results)
 
 
+@pytest.mark.asyncio
+async def test_store_batch(qdrant_connector):
+    """Test storing several entries at once and searching for them."""
+    entries = [
+        Entry(content="Python is a programming language", metadata={"n": 1}),
+        Entry(content="The Eiffel Tower is in Paris", metadata={"n": 2}),
+        Entry(content="Machine learning is a subset of AI"),
+    ]
+    await qdrant_connector.store_batch(entries)
+
+    results = await qdrant_connector.search("Eiffel Tower Paris", limit=3)
+    assert len(results) == 3
+    assert results[0].content == "The Eiffel Tower is in Paris"
+    assert results[0].metadata == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_store_with_point_id(qdrant_connector):
+    """Test that storing under an existing point ID replaces the entry."""
+    point_id = str(uuid.uuid4())
+    await qdrant_connector.store(Entry(content="The fox is brown"), point_id=point_id)
+    await qdrant_connector.store_batch(
+        [Entry(content="The fox is red"), Entry(content="The dog is lazy")],
+        point_ids=[point_id, None],
+    )
+
+    points = await qdrant_connector._client.retrieve(
+        qdrant_connector._default_collection_name, [point_id], with_payload=True
+    )
+    assert points[0].payload["document"] == "The fox is red"
+    count = await qdrant_connector._client.count(qdrant_connector._default_collection_name)
+    assert count.count == 2
+
+
+@pytest.mark.asyncio
+async def test_search_batch(qdrant_connector):
+    """Test running several searches in one call."""
+    await qdrant_connector.store_batch(
+        [
+            Entry(content="Python is a programming language"),
+            Entry(content="The Eiffel Tower is in Paris"),
+        ]
+    )
+
+    results = await qdrant_connector.search_batch(
+        ["Python programming", "Eiffel Tower Paris"], limit=[1, 2]
+    )
+
+    assert len(results) == 2
+    assert [entry.content for entry in results[0]] == [
+        "Python is a programming language"
+    ]
+    assert len(results[1]) == 2
+    assert results[1][0].content == "The Eiffel Tower is in Paris"
+
+
+@pytest.mark.asyncio
+async def test_search_batch_nonexistent_collection(qdrant_connector):
+    """Test that a batch search in a missing collection returns no entries per query."""
+    results = await qdrant_connector.search_batch(
+        ["a", "b"], collection_name=f"nonexistent_{uuid.uuid4().hex}"
+    )
+    assert results == [[], []]
+
+
 @pytest.mark.asyncio
 async def test_ensure_collection_exists(qdrant_connector):
     """Test that the collection is created if it doesn't exist."""
@@ -110,6 +176,65 @@ async def test_ensure_collection_exists(qdrant_connector):
     )
 
 
+def record_calls(monkeypatch, obj, name):
+    """Wrap a client method so the keyword arguments of every call are recorded."""
+    calls = []
+    method = getattr(obj, name)
+
+    async def recorded(*args, **kwargs):
+        calls.append(kwargs)
+        return await method(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, recorded)
+    return calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("ignore:Local mode performs exact")
+@pytest.mark.parametrize(
+    "quantization, config_type",
+    [
+        ("none", type(None)),
+        ("scalar", models.ScalarQuantization),
+        ("binary", models.BinaryQuantization),
+    ],
+)
+async def test_quantization(provider, monkeypatch, quantization, config_type):
+    """Test that the collection is created with the quantization config and searched with rescoring."""
+    # The stub provider is enough here: local mode accepts the quantization config but does
+    # not apply or report it, so the test checks what the connector sends to the client.
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=provider,
+        quantization=quantization,
+    )
+    create_calls = record_calls(monkeypatch, connector._client, "create_collection")
+    search_calls = record_calls(monkeypatch, connector._client, "query_points")
+    batch_calls = record_calls(monkeypatch, connector._client, "query_batch_points")
+
+    await connector.store(Entry(content="The quick brown fox jumps over the lazy dog"))
+    assert len(await connector.search("fox jumps")) == 1
+    assert len((await connector.search_batch(["fox jumps"]))[0]) == 1
+
+    assert len(create_calls) == 1
+    config = create_calls[0]["quantization_config"]
+    assert isinstance(config, config_type)
+    search_params = search_calls[0]["search_params"]
+    batch_params = [request.params for request in batch_calls[0]["requests"]]
+    if quantization == "none":
+        assert search_params is None
+        assert batch_params == [None]
+        return
+    config_inner = config.scalar if quantization == "scalar" else config.binary
+    assert config_inner.always_ram is True
+    for params in [search_params, *batch_params]:
+        assert params.quantization.ignore is False
+        assert params.quantization.rescore is True
+        assert params.quantization.oversampling == 2.0
+
+
 @pytest.mark.asyncio
 async def test_metadata_handling(qdrant_connector):
     """Test that metadata is properly stored and retrieved."""
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from mcp_server_qdrant.semantic_cache import SemanticQueryCache
+
+SCOPE = ("default", 10, None)
+MONOTONIC = "mcp_server_qdrant.semantic_cache.time.monotonic"
+
+
+class TestSemanticQueryCache:
+    def test_exact_hit(self):
+        """Test that the same query text in the same scope is served from the cache."""
+        cache = SemanticQueryCache(max_size=4)
+        cache.put("fox", SCOPE, [1.0, 0.0], {"result": ["a"]})
+
+        assert cache.get("fox", SCOPE) == {"result": ["a"]}
+        assert cache.get("fox", ("other", 10, None)) is None
+        assert cache.get("dog", SCOPE) is None
+
+    def test_similar_hit(self):
+        """Test that a near-duplicate query embedding reuses the cached result."""
+        cache = SemanticQueryCache(max_size=4, threshold=0.95)
+        cache.put("fox", SCOPE, [1.0, 0.0], "fox-result")
+        cache.put("dog", SCOPE, [0.0, 1.0], "dog-result")
+
+        assert cache.get_similar([0.99, 0.05], SCOPE) == "fox-result"
+        assert cache.get_similar([0.7, 0.7], SCOPE) is None
+        assert cache.get_similar([0.99, 0.05], ("other", 10, None)) is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used query is evicted when the cache is full."""
+        cache = SemanticQueryCache(max_size=2)
+        cache.put("a", SCOPE, [1.0, 0.0], "a")
+        cache.put("b", SCOPE, [0.0, 1.0], "b")
+        assert cache.get("a", SCOPE) == "a"
+
+        cache.put("c", SCOPE, [1.0, 1.0], "c")
+
+        assert len(cache) == 2
+        assert cache.get("b", SCOPE) is None
+        assert cache.get("a", SCOPE) == "a"
+        assert cache.get("c", SCOPE) == "c"
+
+    def test_expiry(self):
+        """Test that a result is neither an exact nor a similar hit once its TTL has passed."""
+        cache = SemanticQueryCache(max_size=4, ttl=10)
+        with patch(MONOTONIC, return_value=100.0):
+            cache.put("fox", SCOPE, [1.0, 0.0], "fox-result")
+        with patch(MONOTONIC, return_value=105.0):
+            assert cache.get("fox", SCOPE) == "fox-result"
+            assert cache.get_similar([0.99, 0.05], SCOPE) == "fox-result"
+        with patch(MONOTONIC, return_value=111.0):
+            assert cache.get_similar([0.99, 0.05], SCOPE) is None
+            assert cache.get("fox", SCOPE) is None
+        assert len(cache) == 0
+
+    def test_invalidate_collection(self):
+        """Test that invalidating a collection only drops results from that collection."""
+        cache = SemanticQueryCache(max_size=4)
+        other = ("other", 10, None)
+        cache.put("fox", SCOPE, [1.0, 0.0], "default-fox")
+        cache.put("fox", other, [1.0, 0.0], "other-fox")
+
+        cache.invalidate_collection("default")
+
+        assert cache.get("fox", SCOPE) is None
+        assert cache.get_similar([1.0, 0.0], SCOPE) is None
+        assert cache.get("fox", other) == "other-fox"
+
+    def test_put_after_invalidation_skipped(self):
+        """Test that a result computed before its collection was invalidated is not cached."""
+        cache = SemanticQueryCache(max_size=4)
+        other = ("other", 10, None)
+        generation = cache.generation("default")
+        other_generation = cache.generation("other")
+
+        cache.invalidate_collection("default")
+        cache.put("fox", SCOPE, [1.0, 0.0], "stale", generation)
+        cache.put("fox", other, [1.0, 0.0], "fresh", other_generation)
+
+        assert cache.get("fox", SCOPE) is None
+        assert cache.get("fox", other) == "fresh"
@@ -16,7 +16,16 @@ class TestQdrantSettings:
         """Test that required fields raise errors when not provided."""
 
         # Should not raise error because there are no required fields
-        QdrantSettings()
+        settings = QdrantSettings()
+        assert settings.query_cache_enabled is False
+        assert settings.query_cache_size == 1024
+        assert settings.query_cache_threshold == 0.95
+        assert settings.query_cache_ttl == 300
+        assert settings.result_cache_enabled is False
+        assert settings.quantization == "none"
+        assert settings.quantization_always_ram is True
+        assert settings.pool_size is None
+        assert settings.prefer_grpc is False
 
     @patch.dict(
         os.environ,
@@ -47,6 +56,16 @@ class TestQdrantSettings:
         assert settings.collection_name == "my_memories"
         assert settings.local_path == "/tmp/qdrant"
 
+    @patch.dict(
+        os.environ,
+        {"QDRANT_QCACHE_ENABLED": "true", "QDRANT_QCACHE_THRESHOLD": "0.9"},
+    )
+    def test_query_cache_config(self):
+        """Test enabling the semantic query cache from environment variables."""
+        settings = QdrantSettings()
+        assert settings.query_cache_enabled is True
+        assert settings.query_cache_threshold == 0.9
+
 
 class TestEmbeddingProviderSettings:
     def test_default_values(self):
@@ -54,16 +73,24 @@ class TestEmbeddingProviderSettings:
         settings = EmbeddingProviderSettings()
         assert settings.provider_type == EmbeddingProviderType.FASTEMBED
         assert settings.model_name == "sentence-transformers/all-MiniLM-L6-v2"
+        assert settings.cache_path is None
+        assert settings.warmup is None
 
     @patch.dict(
         os.environ,
-        {"EMBEDDING_MODEL": "custom_model"},
+        {
+            "EMBEDDING_MODEL": "custom_model",
+            "EMBEDDING_CACHE_PATH": "/tmp/embeddings.db",
+            "MCP_EMBED_WARMUP": "1",
+        },
     )
     def test_custom_values(self):
         """Test loading custom values from environment variables."""
         settings = EmbeddingProviderSettings()
         assert settings.provider_type == EmbeddingProviderType.FASTEMBED
         assert settings.model_name == "custom_model"
+        assert settings.cache_path == "/tmp/embeddings.db"
+        assert settings.warmup is True
 
 
 class TestToolSettings:
@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+from mcp_server_qdrant.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_and_put(self):
+        """Test that stored values are returned and hits and misses are counted."""
+        cache = TTLCache(max_size=4, ttl=60)
+        cache.put("fox", [1.0, 0.0])
+
+        assert cache.get("fox") == [1.0, 0.0]
+        assert cache.get("dog") is None
+        assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when the cache is full."""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_expiry(self):
+        """Test that an entry is dropped once its time to live has passed."""
+        cache = TTLCache(max_size=2, ttl=10)
+        with patch("mcp_server_qdrant.ttl_cache.time.monotonic", return_value=100.0):
+            cache.put("a", 1)
+        with patch("mcp_server_qdrant.ttl_cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") == 1
+        with patch("mcp_server_qdrant.ttl_cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0